@@ -8,6 +8,7 @@ from __future__ import annotations
 
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 from .config import Settings, get_settings
 from .generation import _client_azure, _client_ollama, _resolve_provider
@@ -42,8 +43,36 @@ Important rules:
 8. Output ONLY the anonymized text, nothing else.\
 """
 
+# The system turn never changes; build the message dict once and reuse it
+_SYSTEM_MSG = {"role": "system", "content": _SYSTEM_PROMPT}
+
 _USER_PROMPT_TEMPLATE = "Anonymize the following text:\n\n{text}"
 
+# Several short texts can share one request ("row marshaling"); they are joined
+# with this separator, which the model is told to keep so we can split the output.
+_CHUNK_BOUNDARY = "\n---CHUNK_BOUNDARY---\n"
+_CHUNK_BOUNDARY_RE = re.compile(r"\s*---CHUNK_BOUNDARY---\s*")
+_BATCH_PROMPT_TEMPLATE = (
+    "The text below consists of several independent sections separated by lines "
+    "reading ---CHUNK_BOUNDARY---. Keep every separator line exactly as-is.\n\n"
+    "Anonymize the following text:\n\n{text}"
+)
+
+# Cheap pre-check: only text that is plainly free of PII skips the LLM round trip.
+# Any digit or "@", a URL, or a capitalized token that doesn't start a sentence
+# makes the text a candidate (false positives only cost an LLM call).
+_PII_HINT = re.compile(
+    r"\d|@|https?://|\w\.[a-z]{2,}\b"  # numbers (phones, streets, ZIP codes, plates, IBANs), emails, URLs/domains
+    r"|(?<![.!?\s])[^\S\n]+[A-ZÀ-ÖØ-Þ]"  # capitalized word mid-sentence (names, places, companies)
+    r"|[^\s.!?][A-ZÀ-ÖØ-Þ]"  # capital right after another character: "(Müller", "«Meier", acronyms
+)
+
+# Max characters per LLM request; longer texts are split into chunks
+_MAX_CHARS = 6000
+
+# Max concurrent LLM requests per long document (keeps us under provider rate limits)
+_MAX_PARALLEL_CHUNKS = 8
+
 
 def anonymize_text(text: str, settings: Settings | None = None) -> str:
     """Replace PII in *text* with generic placeholders using the configured LLM.
@@ -55,6 +84,8 @@ def anonymize_text(text: str, settings: Settings | None = None) -> str:
         return text
 
     settings = settings or get_settings()
+    if not _may_contain_pii(text, settings):
+        return text
     provider = _resolve_provider(settings)
 
     if provider == "none":
@@ -64,77 +95,144 @@ def anonymize_text(text: str, settings: Settings | None = None) -> str:
     user_prompt = _USER_PROMPT_TEMPLATE.format(text=text)
 
     # For very long texts, process in chunks to stay within context limits
-    max_chars = 6000
-    if len(text) > max_chars:
-        return _anonymize_long_text(text, max_chars, settings, provider)
+    if len(text) > _MAX_CHARS:
+        return _anonymize_long_text(text, _MAX_CHARS, settings, provider)
 
     return _call_llm(user_prompt, settings, provider) or text
 
 
-def _anonymize_long_text(text: str, max_chars: int, settings: Settings, provider: str) -> str:
-    """Split long text into chunks, anonymize each, then reassemble."""
-    paragraphs = text.split("\n\n")
-    chunks: list[str] = []
-    current_chunk: list[str] = []
-    current_len = 0
+def anonymize_texts(texts: list[str], settings: Settings | None = None) -> list[str]:
+    """Anonymize several texts, packing short ones into shared LLM requests.
 
-    for para in paragraphs:
-        if current_len + len(para) + 2 > max_chars and current_chunk:
-            chunks.append("\n\n".join(current_chunk))
-            current_chunk = []
+    Short texts are joined with a boundary marker up to the per-request size
+    limit and sent as one prompt; the response is split back on the marker.
+    If the model drops or adds a marker, that group falls back to one request
+    per text. Groups are processed concurrently. Order is preserved.
+    """
+    results = list(texts)
+    settings = settings or get_settings()
+    provider = _resolve_provider(settings)
+
+    if provider == "none":
+        if any(t and t.strip() for t in texts):
+            logger.warning("PII anonymization requested but no LLM provider available")
+        return results
+
+    groups: list[list[int]] = []
+    current: list[int] = []
+    current_len = 0
+    for i, text in enumerate(texts):
+        if not text or not text.strip() or not _may_contain_pii(text, settings):
+            continue
+        if len(text) > _MAX_CHARS:
+            groups.append([i])
+            continue
+        if current and current_len + len(text) + len(_CHUNK_BOUNDARY) > _MAX_CHARS:
+            groups.append(current)
+            current = []
             current_len = 0
-        current_chunk.append(para)
-        current_len += len(para) + 2
+        current.append(i)
+        current_len += len(text) + len(_CHUNK_BOUNDARY)
+    if current:
+        groups.append(current)
+    if not groups:
+        return results
+
+    def run_group(group: list[int]) -> list[str]:
+        if len(group) == 1:
+            return [anonymize_text(texts[group[0]], settings)]
+        combined = _CHUNK_BOUNDARY.join(texts[i] for i in group)
+        response = _call_llm(_BATCH_PROMPT_TEMPLATE.format(text=combined), settings, provider)
+        parts = _CHUNK_BOUNDARY_RE.split(response) if response else []
+        if len(parts) != len(group):
+            logger.info("Batched anonymization returned %d parts for %d texts; retrying individually", len(parts), len(group))
+            return [anonymize_text(texts[i], settings) for i in group]
+        return [part or texts[i] for part, i in zip(parts, group)]
+
+    with ThreadPoolExecutor(max_workers=min(_MAX_PARALLEL_CHUNKS, len(groups))) as ex:
+        for group, outputs in zip(groups, ex.map(run_group, groups)):
+            for i, out in zip(group, outputs):
+                results[i] = out
+    return results
+
+
+def _may_contain_pii(text: str, settings: Settings) -> bool:
+    """False only if the pre-filter is enabled and finds no PII candidate in *text*."""
+    return not settings.pii_prefilter_enabled or _PII_HINT.search(text) is not None
 
-    if current_chunk:
-        chunks.append("\n\n".join(current_chunk))
 
-    anonymized_parts: list[str] = []
-    for chunk in chunks:
-        user_prompt = _USER_PROMPT_TEMPLATE.format(text=chunk)
-        result = _call_llm(user_prompt, settings, provider)
-        anonymized_parts.append(result if result else chunk)
+def _anonymize_long_text(text: str, max_chars: int, settings: Settings, provider: str) -> str:
+    """Split long text into chunks, anonymize each, then reassemble."""
+    # Walk paragraph boundaries ("\n\n") by index and slice each chunk straight
+    # out of *text*, instead of splitting into paragraphs and re-joining them.
+    chunks: list[str] = []
+    chunk_start = 0
+    chunk_end = -1  # end of the last paragraph in the current chunk; -1 = empty
+    pos = 0
+    while pos <= len(text):
+        para_end = text.find("\n\n", pos)
+        if para_end == -1:
+            para_end = len(text)
+        if chunk_end >= 0 and para_end - chunk_start + 2 > max_chars:
+            chunks.append(text[chunk_start:chunk_end])
+            chunk_start = pos
+        chunk_end = para_end
+        pos = para_end + 2
+    chunks.append(text[chunk_start:chunk_end])
+
+    # Pre-filled with the original chunks (the fallback on failure); each worker
+    # writes its result into its own slot, so completion order does not matter.
+    anonymized_parts = list(chunks)
+
+    def anonymize_chunk(i: int) -> None:
+        result = _call_llm(_USER_PROMPT_TEMPLATE.format(text=chunks[i]), settings, provider)
+        if result:
+            anonymized_parts[i] = result
+
+    with ThreadPoolExecutor(max_workers=min(_MAX_PARALLEL_CHUNKS, len(chunks))) as ex:
+        for future in [ex.submit(anonymize_chunk, i) for i in range(len(chunks))]:
+            future.result()
 
     return "\n\n".join(anonymized_parts)
 
 
 def _call_llm(user_prompt: str, settings: Settings, provider: str) -> str | None:
     """Send the anonymization request to the LLM. Returns anonymized text or None on failure."""
+    call = _PROVIDER_CALLS.get(provider)
+    return call(user_prompt, settings) if call else None
+
 
-    if provider == "azure":
-        client = _client_azure(settings)
-        if client:
-            try:
-                r = client.chat.completions.create(
-                    model=settings.azure_openai_chat_deployment,
-                    messages=[
-                        {"role": "system", "content": _SYSTEM_PROMPT},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                    max_tokens=2000,
-                    temperature=0.0,
-                )
-                if r.choices and r.choices[0].message.content:
-                    return r.choices[0].message.content.strip()
-            except Exception as e:
-                logger.warning("PII anonymization (Azure) failed: %s", e)
-        return None
-
-    if provider == "ollama":
-        client = _client_ollama(settings)
+def _call_azure(user_prompt: str, settings: Settings) -> str | None:
+    client = _client_azure(settings)
+    if client:
         try:
             r = client.chat.completions.create(
-                model=settings.ollama_chat_model,
-                messages=[
-                    {"role": "system", "content": _SYSTEM_PROMPT},
-                    {"role": "user", "content": user_prompt},
-                ],
+                model=settings.azure_openai_chat_deployment,
+                messages=[_SYSTEM_MSG, {"role": "user", "content": user_prompt}],
                 max_tokens=2000,
                 temperature=0.0,
             )
             if r.choices and r.choices[0].message.content:
                 return r.choices[0].message.content.strip()
         except Exception as e:
-            logger.warning("PII anonymization (Ollama) failed: %s", e)
+            logger.warning("PII anonymization (Azure) failed: %s", e)
+    return None
 
+
+def _call_ollama(user_prompt: str, settings: Settings) -> str | None:
+    client = _client_ollama(settings)
+    try:
+        r = client.chat.completions.create(
+            model=settings.ollama_chat_model,
+            messages=[_SYSTEM_MSG, {"role": "user", "content": user_prompt}],
+            max_tokens=2000,
+            temperature=0.0,
+        )
+        if r.choices and r.choices[0].message.content:
+            return r.choices[0].message.content.strip()
+    except Exception as e:
+        logger.warning("PII anonymization (Ollama) failed: %s", e)
     return None
+
+
+_PROVIDER_CALLS = {"azure": _call_azure, "ollama": _call_ollama}
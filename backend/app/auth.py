@@ -1,10 +1,13 @@
 """JWT creation/verification and FastAPI dependencies (get_current_user, get_current_admin)."""
 from __future__ import annotations
 
+import hashlib
+import threading
 import time
 from typing import Annotated
 
 import jwt
+from cachetools import LRUCache, TTLCache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
@@ -13,33 +16,84 @@ from .user_store import get_user_by_email, get_user_by_id, verify_password
 
 security = HTTPBearer(auto_error=False)
 
+# JWT codec, HMAC key bytes and algorithm list are built once instead of per call
+_JWT = jwt.PyJWT()
+_JWT_KEY = get_settings().jwt_secret.encode("utf-8")
+_JWT_ALGORITHMS = [get_settings().jwt_algorithm]
+_JWT_DECODE_OPTIONS = {"require": ["exp", "sub"]}
+_JWT_EXPIRE_SECONDS = get_settings().jwt_expire_seconds
+
+# (payload, exp) keyed by a short SHA-256 digest of the token, so clients that
+# reuse a bearer token skip signature verification until the token's own expiry.
+_TOKEN_CACHE: LRUCache = LRUCache(maxsize=4096)
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+# User rows by id, so repeat requests from the same user skip the SQLite lookup.
+# Admin endpoints that change or delete a user call invalidate_user_cache().
+_USER_CACHE: TTLCache = TTLCache(maxsize=5000, ttl=60)
+_USER_CACHE_LOCK = threading.Lock()
+
+
+def invalidate_user_cache(user_id: str | None = None) -> None:
+    """Drop the cached user *user_id*, or every cached user if None."""
+    with _USER_CACHE_LOCK:
+        if user_id is None:
+            _USER_CACHE.clear()
+        else:
+            _USER_CACHE.pop(user_id, None)
+
+
+def _get_user_cached(user_id: str) -> dict | None:
+    with _USER_CACHE_LOCK:
+        user = _USER_CACHE.get(user_id)
+    if user is None:
+        user = get_user_by_id(user_id)
+        if user is not None:
+            with _USER_CACHE_LOCK:
+                _USER_CACHE[user_id] = user
+    return user
+
 
 def create_access_token(user_id: str, email: str, role: str) -> str:
-    settings = get_settings()
     payload = {
         "sub": user_id,
         "email": email,
         "role": role,
-        "exp": int(time.time()) + settings.jwt_expire_seconds,
+        "exp": int(time.time()) + _JWT_EXPIRE_SECONDS,
     }
-    return jwt.encode(
-        payload,
-        settings.jwt_secret,
-        algorithm=settings.jwt_algorithm,
-    )
+    return _JWT.encode(payload, _JWT_KEY, algorithm=_JWT_ALGORITHMS[0])
 
 
 def decode_token(token: str) -> dict | None:
-    settings = get_settings()
+    """Verify and decode *token*; returns the payload or None if invalid/expired.
+
+    Valid payloads are cached until their exp claim; an expired entry is evicted
+    and the token re-verified (which then fails).
+    """
+    key = hashlib.sha256(token.encode("utf-8")).digest()[:16]
+    with _TOKEN_CACHE_LOCK:
+        cached = _TOKEN_CACHE.get(key)
+    if cached is not None:
+        payload, exp = cached
+        if time.time() < exp:
+            return payload
+        with _TOKEN_CACHE_LOCK:
+            _TOKEN_CACHE.pop(key, None)
+
     try:
-        payload = jwt.decode(
+        payload = _JWT.decode(
             token,
-            settings.jwt_secret,
-            algorithms=[settings.jwt_algorithm],
+            _JWT_KEY,
+            algorithms=_JWT_ALGORITHMS,
+            options=_JWT_DECODE_OPTIONS,
         )
-        return payload
     except jwt.PyJWTError:
         return None
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        with _TOKEN_CACHE_LOCK:
+            _TOKEN_CACHE[key] = (payload, exp)
+    return payload
 
 
 def get_current_user(
@@ -66,7 +120,7 @@ def get_current_user(
             detail="Invalid token",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    user = get_user_by_id(user_id)
+    user = _get_user_cached(user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
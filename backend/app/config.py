@@ -1,4 +1,5 @@
 """Application configuration from environment."""
+from functools import cached_property, lru_cache
 from pathlib import Path
 
 from pydantic_settings import BaseSettings
@@ -18,6 +19,10 @@ class Settings(BaseSettings):
 
     # Embeddings: local by default
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    # Local inference backend: "torch" (default), "onnx" or "openvino" (needs sentence-transformers[onnx] / [openvino])
+    embedding_backend: str = "torch"
+    # Optional model file for non-torch backends, e.g. "onnx/model_qint8_avx512_vnni.onnx" for INT8
+    embedding_model_file: str | None = None
     use_openai_embeddings: bool = False
     openai_api_key: str | None = None
     openai_embedding_model: str = "text-embedding-ada-002"
@@ -41,12 +46,26 @@ class Settings(BaseSettings):
     # HyDE: allow hypothetical answer for retrieval (only used when LLM is available)
     hyde_enabled: bool = True
 
+    # Semantic answer cache for /api/ask: reuse an answer when a new question's embedding has
+    # cosine similarity >= threshold with a recent one (same filters and options)
+    semantic_cache_enabled: bool = True
+    semantic_cache_threshold: float = 0.92
+    semantic_cache_ttl_seconds: float = 300.0
+    semantic_cache_max_size: int = 256
+    # /api/refine entries: matched on the refinement prompt within the same answer + sources
+    semantic_cache_refine_threshold: float = 0.95
+    semantic_cache_refine_ttl_seconds: float = 600.0
+    # Retrieval results (used by /api/ask/stream and on /api/ask answer-cache misses)
+    semantic_cache_retrieval_threshold: float = 0.97
+
     # Example question search: hybrid retrieval using embedded example questions
     enable_example_question_search: bool = True
     example_question_search_weight: float = 0.3  # weight for example question score in fusion (0.0-1.0)
 
     # PII anonymization: replace sensitive data (names, addresses, etc.) with placeholders
     enable_pii_anonymization: bool = True
+    # Skip the LLM for texts with no plausible PII (no emails, numbers, name-like words, URLs)
+    pii_prefilter_enabled: bool = True
 
     # Translation indexing: store translated versions of snippets for cross-language retrieval
     enable_translation_indexing: bool = True
@@ -70,15 +89,26 @@ class Settings(BaseSettings):
     admin_email: str | None = None
     admin_password: str | None = None
     database_url: str = "data/users.db"
+    # Persistent cache for deterministic LLM outputs (HyDE, example questions). Set empty to disable.
+    llm_cache_path: str = "data/llm_cache.db"
+    # Persistent cache of document embeddings keyed by (model, text hash); re-indexing unchanged text skips the model. Set empty to disable.
+    embedding_cache_path: str = "data/embedding_cache.db"
 
     model_config = {"env_file": _BACKEND_DIR / ".env", "extra": "ignore"}
 
-    def get_translation_languages(self) -> list[str]:
-        """Return translation_languages as a list."""
+    @cached_property
+    def translation_languages_list(self) -> list[str]:
+        """translation_languages parsed once into a list of lowercase codes."""
         if not self.translation_languages:
             return []
         return [lang.strip().lower() for lang in self.translation_languages.split(",") if lang.strip()]
 
+    def get_translation_languages(self) -> list[str]:
+        """Return translation_languages as a list."""
+        return self.translation_languages_list
+
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
+    """Return the process-wide Settings (built once; call get_settings.cache_clear() to reload)."""
     return Settings()
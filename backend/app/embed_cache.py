@@ -0,0 +1,28 @@
+"""Persistent SQLite cache of document embeddings, keyed by embedding model and text.
+
+Re-indexing unchanged text (snippet updates delete and re-add every chunk, imports,
+example question edits) then reads vectors from disk instead of running the model.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from .sqlite_cache import SQLiteCache
+
+# Disabled when EMBEDDING_CACHE_PATH is empty
+_cache = SQLiteCache("Embedding cache", "embedding_cache_path", "embeddings", "BLOB", "vector", "BLOB")
+
+
+def get_many(keys: list[bytes]) -> dict[bytes, np.ndarray]:
+    """Return {key: float32 vector} for the keys that are cached."""
+    return {key: np.frombuffer(blob, dtype=np.float32) for key, blob in _cache.get_many(keys).items()}
+
+
+def put_many(keys: list[bytes], vectors: np.ndarray) -> None:
+    """Store one float32 vector per key (overwrites)."""
+    _cache.put_many(zip(keys, (np.asarray(v, dtype=np.float32).tobytes() for v in vectors)))
+
+
+def reset() -> None:
+    """Reopen the cache database on next use (after a restore replaced the file)."""
+    _cache.reset()
@@ -1,43 +1,67 @@
 """Embedding model loading and encoding (sentence-transformers or Azure OpenAI)."""
 from __future__ import annotations
 
+import hashlib
 import logging
-from typing import TYPE_CHECKING
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
-if TYPE_CHECKING:
-    import numpy as np
+import numpy as np
+
+from . import embed_cache
+from .config import get_settings
 
 logger = logging.getLogger(__name__)
 
 _model = None
 _azure_client = None
+# Azure-vs-local decision and deployment name; settings don't change at runtime, so resolve once.
+_azure_enabled: bool | None = None
+_azure_deployment: str | None = None
+
+# LRU cache for single-text embeddings (repeated queries, HyDE retries), local or Azure
+_EMB_CACHE_MAX = 4096
+_EMB_CACHE: OrderedDict[bytes, np.ndarray] = OrderedDict()
+_EMB_CACHE_LOCK = threading.Lock()
 
 
 def _use_azure_embeddings():
-    from .config import get_settings
-    s = get_settings()
-    endpoint = (s.azure_openai_endpoint or "").strip()
-    key = (s.azure_openai_api_key or "").strip()
-    deployment = (s.azure_openai_embedding_deployment or "").strip()
-    if endpoint and key and deployment:
-        return True
-    if endpoint or key:
-        logger.warning(
-            "Azure endpoint/key set but AZURE_OPENAI_EMBEDDING_DEPLOYMENT missing or empty; using local embeddings. Set it in .env to use Azure for embeddings."
-        )
-    return False
+    global _azure_enabled, _azure_deployment
+    if _azure_enabled is None:
+        s = get_settings()
+        endpoint = (s.azure_openai_endpoint or "").strip()
+        key = (s.azure_openai_api_key or "").strip()
+        deployment = (s.azure_openai_embedding_deployment or "").strip()
+        if endpoint and key and deployment:
+            _azure_deployment = s.azure_openai_embedding_deployment
+            _azure_enabled = True
+        else:
+            if endpoint or key:
+                logger.warning(
+                    "Azure endpoint/key set but AZURE_OPENAI_EMBEDDING_DEPLOYMENT missing or empty; using local embeddings. Set it in .env to use Azure for embeddings."
+                )
+            _azure_enabled = False
+    return _azure_enabled
 
 
 def get_embedding_model():
     """Lazy-load sentence-transformers model (used when Azure embeddings not configured)."""
     global _model
     if _model is None:
-        from .config import get_settings
         settings = get_settings()
         try:
             from sentence_transformers import SentenceTransformer
-            logger.info("Loading embedding model: %s", settings.embedding_model)
-            _model = SentenceTransformer(settings.embedding_model)
+            backend = (settings.embedding_backend or "torch").strip().lower()
+            kwargs = {}
+            if backend != "torch":
+                kwargs["backend"] = backend
+                if settings.embedding_model_file:
+                    kwargs["model_kwargs"] = {"file_name": settings.embedding_model_file}
+            logger.info("Loading embedding model: %s (backend=%s)", settings.embedding_model, backend)
+            _model = SentenceTransformer(settings.embedding_model, **kwargs)
+            if backend == "torch" and str(_model.device).startswith("cuda"):
+                _model.half()  # FP16 halves memory bandwidth on GPU
         except Exception as e:
             hint = ""
             if (settings.azure_openai_endpoint or "").strip() and (settings.azure_openai_api_key or "").strip():
@@ -48,12 +72,17 @@ def get_embedding_model():
     return _model
 
 
+def warm_up() -> None:
+    """Load the local embedding model now so the first request doesn't pay for it (no-op with Azure)."""
+    if not _use_azure_embeddings():
+        get_embedding_model()
+
+
 def _get_azure_embedding_client():
     """Lazy-create Azure OpenAI client for embeddings."""
     global _azure_client
     if _azure_client is None:
         from openai import AzureOpenAI
-        from .config import get_settings
         s = get_settings()
         _azure_client = AzureOpenAI(
             api_key=s.azure_openai_api_key,
@@ -63,19 +92,105 @@ def _get_azure_embedding_client():
     return _azure_client
 
 
-def embed(texts: list[str]) -> "np.ndarray":
-    """Return embedding matrix of shape (len(texts), dim). Uses Azure OpenAI if configured, else sentence-transformers."""
-    import numpy as np
+def embed(texts: list[str]) -> np.ndarray:
+    """Return embedding matrix of shape (len(texts), dim). Uses Azure OpenAI if configured, else sentence-transformers.
+
+    Duplicate texts are embedded once and the vectors scattered back into place.
+    Single-text calls (query embeddings) are served from an LRU cache.
+    """
+    if len(texts) == 1:
+        return _embed_one_cached(texts[0])
+    unique = list(dict.fromkeys(texts))
+    if len(unique) == len(texts):
+        return _embed_batch(texts)
+    vectors = _embed_batch(unique)
+    position = {t: i for i, t in enumerate(unique)}
+    return vectors[[position[t] for t in texts]]
+
+
+def _model_id() -> str:
+    """Identify the embedding model, so cached vectors from another model are never reused."""
+    if _use_azure_embeddings():
+        return f"azure:{_azure_deployment}"
+    s = get_settings()
+    return f"local:{s.embedding_model}:{s.embedding_backend}:{s.embedding_model_file}"
+
+
+def embed_documents(texts: list[str]) -> np.ndarray:
+    """Like embed(), but reads and fills the on-disk embedding cache (EMBEDDING_CACHE_PATH).
+
+    Used when indexing: only texts not embedded before by the current model hit the model.
+    """
+    if not texts:
+        return embed(texts)
+    prefix = _model_id().encode("utf-8") + b"\0"
+    key_of = {t: hashlib.blake2b(prefix + t.encode("utf-8"), digest_size=20).digest() for t in texts}
+    cached = embed_cache.get_many(list(key_of.values()))
+    missing = [t for t, k in key_of.items() if k not in cached]
+    if missing:
+        vectors = embed(missing)
+        missing_keys = [key_of[t] for t in missing]
+        embed_cache.put_many(missing_keys, vectors)
+        cached.update(zip(missing_keys, vectors))
+    return np.stack([cached[key_of[t]] for t in texts])
+
+
+def clear_cache() -> None:
+    """Drop cached query embeddings (e.g. after switching the embedding model)."""
+    with _EMB_CACHE_LOCK:
+        _EMB_CACHE.clear()
+
+
+def _embed_one_cached(text: str) -> np.ndarray:
+    key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    with _EMB_CACHE_LOCK:
+        vec = _EMB_CACHE.get(key)
+        if vec is not None:
+            _EMB_CACHE.move_to_end(key)
+            return vec[None, :]
+    vec = _embed_batch([text])[0]
+    vec.setflags(write=False)  # shared between callers
+    with _EMB_CACHE_LOCK:
+        _EMB_CACHE[key] = vec
+        if len(_EMB_CACHE) > _EMB_CACHE_MAX:
+            _EMB_CACHE.popitem(last=False)
+    return vec[None, :]
+
+
+# Azure embedding requests: inputs per request (API max is 2048, and large snippet
+# batches also hit the per-request token cap) and requests in flight at once.
+_AZURE_EMBED_BATCH = 256
+_AZURE_EMBED_CONCURRENCY = 8
+
+
+def _azure_embed(texts: list[str]) -> np.ndarray:
+    client = _get_azure_embedding_client()
+    # Azure allows batch input; pass as list of strings
+    response = client.embeddings.create(input=texts, model=_azure_deployment)
+    data = response.data
+    if all(d.index == i for i, d in enumerate(data)):
+        return np.asarray([d.embedding for d in data], dtype=np.float32)
+    # Out of order: write each vector into its row of a preallocated buffer
+    out = np.empty((len(texts), len(data[0].embedding)), dtype=np.float32)
+    for d in data:
+        out[d.index] = d.embedding
+    return out
+
 
+def _embed_batch(texts: list[str]) -> np.ndarray:
     if _use_azure_embeddings():
-        client = _get_azure_embedding_client()
-        from .config import get_settings
-        deployment = get_settings().azure_openai_embedding_deployment
-        # Azure allows batch input; pass as list of strings
-        response = client.embeddings.create(input=texts, model=deployment)
-        # Preserve order (response.data may be ordered by index)
-        by_index = {d.index: d.embedding for d in response.data}
-        vectors = [by_index[i] for i in range(len(texts))]
-        return np.array(vectors, dtype=np.float32)
+        if len(texts) <= _AZURE_EMBED_BATCH:
+            return _azure_embed(texts)
+        batches = [texts[i : i + _AZURE_EMBED_BATCH] for i in range(0, len(texts), _AZURE_EMBED_BATCH)]
+        with ThreadPoolExecutor(max_workers=min(_AZURE_EMBED_CONCURRENCY, len(batches))) as ex:
+            return np.concatenate(list(ex.map(_azure_embed, batches)))
+    # encode() sorts inputs by length internally, so each batch pads to similar lengths.
     model = get_embedding_model()
-    return model.encode(texts, convert_to_numpy=True)
+    vectors = model.encode(
+        texts,
+        batch_size=64,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    )
+    return vectors.astype(np.float32, copy=False)
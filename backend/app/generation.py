@@ -1,32 +1,205 @@
 """Answer generation using Azure OpenAI or Ollama (local)."""
 from __future__ import annotations
 
+import asyncio
+import atexit
+import hashlib
 import logging
-from openai import AzureOpenAI, OpenAI
-
+import random
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from functools import lru_cache
+
+import httpx
+from openai import AsyncAzureOpenAI, AsyncOpenAI, AzureOpenAI, OpenAI
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+from . import llm_cache
 from .config import Settings, get_settings
 from .prompt_store import get_prompt
 
 logger = logging.getLogger(__name__)
 
+# Shared pool settings for LLM HTTP clients. HTTP/2 lets concurrent calls to
+# Azure multiplex over one connection (needs the h2 package; plain-http Ollama
+# stays on HTTP/1.1). Local Ollama generation on CPU can be slow, so it gets a
+# longer read timeout.
+_HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60.0)
+_HTTP_TIMEOUT = httpx.Timeout(120.0, connect=5.0)
+_OLLAMA_HTTP_TIMEOUT = httpx.Timeout(300.0, connect=5.0)
+# Retries for transient failures (429, 5xx, connection errors): up to 4 attempts in total.
+# SDK clients do this themselves (exponential backoff with jitter capped at 8s, honours
+# Retry-After, never retries permanent errors such as 400/401); _raw_chat applies the
+# same policy by hand. Only after these are exhausted do callers fall back to the top snippet.
+_MAX_RETRIES = 3
+_RETRY_MAX_DELAY = 8.0
+_RETRYABLE_STATUS = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+def _retry_delay(attempt: int, retry_after: str | None = None) -> float:
+    """Seconds to wait before retry number *attempt* (0-based): Retry-After if given, else backoff with jitter."""
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), _RETRY_MAX_DELAY)
+        except ValueError:
+            pass
+    return min(0.5 * 2**attempt + random.random() * 0.5, _RETRY_MAX_DELAY)
+
+
+# Sampling for retrieval-feature calls (HyDE, example questions): deterministic output
+# keeps retrieval stable and makes results safe to persist in llm_cache.
+_DETERMINISTIC_PARAMS = {"temperature": 0.0, "seed": 42}
+
+
+@lru_cache(maxsize=2)
+def _http_client(ollama: bool = False) -> httpx.Client:
+    """Process-wide HTTP pool shared by the SDK clients and raw chat calls."""
+    client = httpx.Client(
+        http2=True, limits=_HTTP_LIMITS, timeout=_OLLAMA_HTTP_TIMEOUT if ollama else _HTTP_TIMEOUT
+    )
+    atexit.register(client.close)
+    return client
+
+
+@lru_cache(maxsize=8)
+def _azure_client_for(api_key: str, endpoint: str, api_version: str) -> AzureOpenAI:
+    return AzureOpenAI(
+        api_key=api_key,
+        api_version=api_version,
+        azure_endpoint=endpoint,
+        timeout=_HTTP_TIMEOUT,
+        max_retries=_MAX_RETRIES,
+        http_client=_http_client(),
+    )
+
+
+@lru_cache(maxsize=8)
+def _ollama_client_for(base_url: str) -> OpenAI:
+    return OpenAI(
+        base_url=base_url,
+        api_key="ollama",  # Ollama does not require a key
+        timeout=_OLLAMA_HTTP_TIMEOUT,
+        max_retries=_MAX_RETRIES,
+        http_client=_http_client(ollama=True),
+    )
+
 
 def _client_azure(settings: Settings) -> AzureOpenAI | None:
+    """Return a process-wide Azure client (reused so calls share one connection pool)."""
     if not settings.azure_openai_api_key or not settings.azure_openai_endpoint:
         return None
-    return AzureOpenAI(
-        api_key=settings.azure_openai_api_key,
-        api_version=settings.azure_openai_api_version,
-        azure_endpoint=settings.azure_openai_endpoint,
+    return _azure_client_for(
+        settings.azure_openai_api_key,
+        settings.azure_openai_endpoint,
+        settings.azure_openai_api_version,
     )
 
 
 def _client_ollama(settings: Settings) -> OpenAI | None:
-    return OpenAI(
-        base_url=settings.ollama_base_url.rstrip("/") + "/v1",
-        api_key="ollama",  # Ollama does not require a key
+    """Return a process-wide Ollama client (reused so calls share one connection pool)."""
+    return _ollama_client_for(settings.ollama_base_url.rstrip("/") + "/v1")
+
+
+# Async clients hold connections bound to the event loop they were used on, so they
+# are cached per loop as well as per endpoint. Keyed weakly by the loop object: a
+# loop that is gone takes its clients with it, and a new loop never inherits them.
+_async_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple, AsyncOpenAI]] = (
+    weakref.WeakKeyDictionary()
+)
+_async_clients_lock = threading.Lock()
+
+
+def _async_client_for(key: tuple, factory: Callable[[], AsyncOpenAI]) -> AsyncOpenAI:
+    loop = asyncio.get_running_loop()
+    with _async_clients_lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            client = clients[key] = factory()
+    return client
+
+
+async def aclose_async_clients() -> None:
+    """Close the async LLM clients (and their connection pools) of the running event loop."""
+    with _async_clients_lock:
+        clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        try:
+            await client.close()
+        except Exception as e:
+            logger.warning("Closing async LLM client failed: %s", e)
+
+
+def _async_client_azure(settings: Settings) -> AsyncAzureOpenAI | None:
+    if not settings.azure_openai_api_key or not settings.azure_openai_endpoint:
+        return None
+    return _async_client_for(
+        ("azure", settings.azure_openai_api_key, settings.azure_openai_endpoint, settings.azure_openai_api_version),
+        lambda: AsyncAzureOpenAI(
+            api_key=settings.azure_openai_api_key,
+            api_version=settings.azure_openai_api_version,
+            azure_endpoint=settings.azure_openai_endpoint,
+            timeout=_HTTP_TIMEOUT,
+            max_retries=_MAX_RETRIES,
+            http_client=httpx.AsyncClient(http2=True, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT),
+        ),
+    )
+
+
+def _async_client_ollama(settings: Settings) -> AsyncOpenAI | None:
+    base_url = settings.ollama_base_url.rstrip("/") + "/v1"
+    return _async_client_for(
+        ("ollama", base_url),
+        lambda: AsyncOpenAI(
+            base_url=base_url,
+            api_key="ollama",
+            timeout=_OLLAMA_HTTP_TIMEOUT,
+            max_retries=_MAX_RETRIES,
+            http_client=httpx.AsyncClient(http2=True, limits=_HTTP_LIMITS, timeout=_OLLAMA_HTTP_TIMEOUT),
+        ),
     )
 
 
+# Exact-match LLM response cache: hash(provider, model, prompts) -> raw content.
+# Used for answer generation and HyDE, where identical prompts recur.
+_RESPONSE_CACHE_MAX = 512
+_response_cache: OrderedDict[str, str] = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+
+def _response_cache_key(settings: Settings, provider: str, *prompts: str) -> str:
+    model = settings.azure_openai_chat_deployment if provider == "azure" else settings.ollama_chat_model
+    h = hashlib.sha256()
+    for part in (provider, model, *prompts):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _response_cache_get(key: str) -> str | None:
+    with _response_cache_lock:
+        content = _response_cache.get(key)
+        if content is not None:
+            _response_cache.move_to_end(key)
+        return content
+
+
+def _response_cache_put(key: str, content: str) -> None:
+    with _response_cache_lock:
+        _response_cache[key] = content
+        _response_cache.move_to_end(key)
+        if len(_response_cache) > _RESPONSE_CACHE_MAX:
+            _response_cache.popitem(last=False)
+
+
 def _resolve_provider(settings: Settings) -> str:
     if settings.llm_provider == "azure":
         return "azure" if (settings.azure_openai_api_key and settings.azure_openai_endpoint) else "none"
@@ -40,30 +213,265 @@ def _resolve_provider(settings: Settings) -> str:
     return "ollama"
 
 
+# Marker separating the answer body from per-source section labels.
+_SECTIONS_RE = re.compile(r"\bSECT(?:ION)?S?\s*:", re.IGNORECASE)
+
+
 def _parse_answer_and_sections(raw: str, num_sources: int) -> tuple[str, list[str | None]]:
     """Extract answer and optional section labels from LLM output.
 
     Handles various LLM marker formats: SECTIONS:, SECTION:, SECT:,
     or any of those without a trailing colon.
     """
-    import re
-
     raw = (raw or "").strip()
-    match = re.search(r"\bSECT(?:ION)?S?\s*:", raw, re.IGNORECASE)
+    match = _SECTIONS_RE.search(raw)
     if match:
         answer = raw[: match.start()].strip()
-        rest = raw[match.end() :].strip()
-        lines = [line.strip() for line in rest.split("\n") if line.strip()][:num_sources]
-        sections = [lines[i] if i < len(lines) else None for i in range(num_sources)]
+        sections: list[str | None] = []
+        if num_sources:
+            for line in raw[match.end() :].splitlines():
+                line = line.strip()
+                if line:
+                    sections.append(line)
+                    if len(sections) == num_sources:
+                        break
+        sections += [None] * (num_sources - len(sections))
     else:
         answer = raw
         sections = [None] * num_sources
     return answer, sections
 
 
-def _closeness_system_instruction(closeness: float) -> str:
-    """Return system instruction fragment for answer_closeness (0=free, 1=word-for-word)."""
-    return get_prompt("closeness_instruction").format(closeness=closeness)
+@lru_cache(maxsize=256)
+def _render_system_prompt(system_template: str, closeness_template: str, closeness: float) -> str:
+    return system_template.format(closeness_instruction=closeness_template.format(closeness=closeness))
+
+
+def _system_prompt(key: str, closeness: float) -> str:
+    """Return the system prompt `key` with the closeness instruction filled in.
+
+    Rendered prompts are memoized on the template text, so admin edits take effect
+    immediately. Closeness is rounded to two decimals so the same slider position
+    always yields a byte-identical prefix (lets provider-side prompt caching hit).
+    """
+    return _render_system_prompt(get_prompt(key), get_prompt("closeness_instruction"), round(closeness, 2))
+
+
+# "[1] ", "[2] ", ... numbering prefixes for the snippets block.
+_INDEX_PREFIXES = [f"[{i+1}] " for i in range(64)]
+
+
+def format_snippets_block(snippet_texts: list[str]) -> str:
+    """Render snippets as the numbered context block used in answer and refine prompts.
+
+    Callers that answer and then refine over the same snippets can build this once and
+    pass it as ``snippets_block`` to skip re-rendering.
+    """
+    prefixes = _INDEX_PREFIXES
+    if len(snippet_texts) > len(prefixes):
+        prefixes = prefixes + [f"[{i+1}] " for i in range(len(prefixes), len(snippet_texts))]
+    return "\n\n".join([p + t for p, t in zip(prefixes, snippet_texts)])
+
+
+def _answer_prompts(
+    question: str,
+    snippet_texts: list[str],
+    answer_closeness: float,
+    snippets_block: str | None = None,
+) -> tuple[str, str]:
+    """Return (system, user) prompts for answer generation."""
+    if snippets_block is None:
+        snippets_block = format_snippets_block(snippet_texts)
+    system = _system_prompt("answer_generation_system", answer_closeness)
+    user = get_prompt("answer_generation_user").format(question=question, snippets_block=snippets_block)
+    return system, user
+
+
+def _refine_prompts(
+    original_question: str,
+    original_answer: str,
+    refinement_prompt: str,
+    snippet_texts: list[str],
+    answer_closeness: float,
+    snippets_block: str | None = None,
+) -> tuple[str, str]:
+    """Return (system, user) prompts for answer refinement."""
+    if snippets_block is None:
+        snippets_block = format_snippets_block(snippet_texts)
+    system = _system_prompt("refine_system", answer_closeness)
+    user = get_prompt("refine_user").format(
+        original_question=original_question,
+        original_answer=original_answer,
+        refinement_prompt=refinement_prompt,
+        snippets_block=snippets_block,
+    )
+    return system, user
+
+
+# Snippet budget for example question prompts. Measured in tokens when tiktoken is
+# available (cl100k_base; a close enough estimate for Ollama models too), otherwise
+# in characters.
+_EXAMPLE_QUESTION_MAX_TOKENS = 1500
+_EXAMPLE_QUESTION_MAX_CHARS = 2000
+
+
+@lru_cache(maxsize=1)
+def _token_encoder():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except ImportError:
+        logger.warning("tiktoken not installed, truncating prompts by character count")
+    except Exception as e:
+        logger.warning("Could not load tiktoken encoding, truncating prompts by character count: %s", e)
+    return None
+
+
+def _truncate_for_prompt(text: str) -> str:
+    """Truncate text to the example question budget, appending "..." when cut."""
+    enc = _token_encoder()
+    if enc is None:
+        if len(text) <= _EXAMPLE_QUESTION_MAX_CHARS:
+            return text
+        return text[:_EXAMPLE_QUESTION_MAX_CHARS] + "..."
+    tokens = enc.encode(text, disallowed_special=())
+    if len(tokens) <= _EXAMPLE_QUESTION_MAX_TOKENS:
+        return text
+    return enc.decode(tokens[:_EXAMPLE_QUESTION_MAX_TOKENS]) + "..."
+
+
+def _example_question_prompts(snippet_text: str, snippet_title: str | None) -> tuple[str, str]:
+    """Return (system, user) prompts for example question generation."""
+    text_for_prompt = _truncate_for_prompt(snippet_text)
+
+    title_context = f" titled '{snippet_title}'" if snippet_title else ""
+
+    system = get_prompt("example_question_system")
+    user = get_prompt("example_question_user").format(title_context=title_context, text_for_prompt=text_for_prompt)
+    return system, user
+
+
+# Labels models tend to put in front of a generated question ("Question:", "Q:", ...).
+_QPREFIX_RE = re.compile(r"^(?:(?:example\s+question|question|q)\s*:\s*)+", re.IGNORECASE)
+
+
+def _clean_example_question(question: str) -> str:
+    return _QPREFIX_RE.sub("", question.strip(), count=1).strip()
+
+
+def _messages(system: str | None, user: str) -> list[dict]:
+    """Build chat messages; a None system prompt sends the user message alone."""
+    if system is None:
+        return [{"role": "user", "content": user}]
+    return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+
+
+# Per-thread message lists reused by _chat_complete. The sync SDK serializes the
+# request body inside create(), so the lists can be refilled on the next call.
+# Not used on async or streaming paths, where a request can outlive the call site.
+_thread_messages = threading.local()
+
+
+def _reused_messages(system: str | None, user: str) -> list[dict]:
+    tm = _thread_messages
+    if not hasattr(tm, "pair"):
+        tm.pair = [{"role": "system", "content": ""}, {"role": "user", "content": ""}]
+        tm.single = [{"role": "user", "content": ""}]
+    if system is None:
+        tm.single[0]["content"] = user
+        return tm.single
+    tm.pair[0]["content"] = system
+    tm.pair[1]["content"] = user
+    return tm.pair
+
+
+def _chat_complete(
+    system: str | None,
+    user: str,
+    *,
+    max_tokens: int,
+    settings: Settings,
+    provider: str | None = None,
+    what: str = "LLM call",
+    params: dict | None = None,
+) -> str | None:
+    """Run one chat completion on the configured provider. Returns stripped content, or None on failure / no LLM."""
+    provider = provider or _resolve_provider(settings)
+    if provider == "azure":
+        client, model, label = _client_azure(settings), settings.azure_openai_chat_deployment, "Azure"
+    elif provider == "ollama":
+        client, model, label = _client_ollama(settings), settings.ollama_chat_model, "Ollama"
+    else:
+        return None
+    if client is None:
+        return None
+    try:
+        # Raw response: parse the body directly instead of building SDK response models.
+        raw = client.chat.completions.with_raw_response.create(
+            model=model, messages=_reused_messages(system, user), max_tokens=max_tokens, **(params or {})
+        )
+        choices = _json_loads(raw.content).get("choices")
+        content = choices[0]["message"].get("content") if choices else None
+        if content:
+            return content.strip()
+    except Exception as e:
+        logger.warning("%s (%s) failed: %s", what, label, e)
+    return None
+
+
+def _raw_chat(
+    messages: list[dict],
+    max_tokens: int,
+    settings: Settings,
+    provider: str,
+    what: str,
+    params: dict | None = None,
+) -> str | None:
+    """POST a chat completion directly on the shared HTTP pool, skipping SDK response models.
+
+    For small, latency-sensitive calls (HyDE). Transient failures are retried like the SDK
+    clients do (_MAX_RETRIES); callers must still degrade gracefully on None.
+    """
+    payload: dict = {"messages": messages, "max_tokens": max_tokens, **(params or {})}
+    if provider == "azure":
+        if not settings.azure_openai_api_key or not settings.azure_openai_endpoint:
+            return None
+        url = (
+            f"{settings.azure_openai_endpoint.rstrip('/')}/openai/deployments/"
+            f"{settings.azure_openai_chat_deployment}/chat/completions"
+        )
+        params = {"api-version": settings.azure_openai_api_version}
+        headers = {"api-key": settings.azure_openai_api_key}
+        http, label = _http_client(), "Azure"
+    elif provider == "ollama":
+        url = settings.ollama_base_url.rstrip("/") + "/v1/chat/completions"
+        params, headers = None, None
+        payload["model"] = settings.ollama_chat_model
+        http, label = _http_client(ollama=True), "Ollama"
+    else:
+        return None
+    for attempt in range(_MAX_RETRIES + 1):
+        retry_after = None
+        try:
+            r = http.post(url, params=params, headers=headers, json=payload)
+            if r.status_code in _RETRYABLE_STATUS and attempt < _MAX_RETRIES:
+                retry_after = r.headers.get("retry-after")
+                raise httpx.HTTPStatusError(f"HTTP {r.status_code}", request=r.request, response=r)
+            r.raise_for_status()
+            content = _json_loads(r.content)["choices"][0]["message"]["content"]
+            return content.strip() if content else None
+        except (httpx.TransportError, httpx.HTTPStatusError) as e:
+            retryable = isinstance(e, httpx.TransportError) or e.response.status_code in _RETRYABLE_STATUS
+            if not retryable or attempt == _MAX_RETRIES:
+                logger.warning("%s (%s) failed: %s", what, label, e)
+                return None
+            delay = _retry_delay(attempt, retry_after)
+            logger.info("%s (%s) failed (%s), retrying in %.1fs", what, label, e, delay)
+            time.sleep(delay)
+        except Exception as e:
+            logger.warning("%s (%s) failed: %s", what, label, e)
+            return None
+    return None
 
 
 def generate_answer(
@@ -71,10 +479,12 @@ def generate_answer(
     snippet_texts: list[str],
     settings: Settings | None = None,
     answer_closeness: float = 0.5,
+    snippets_block: str | None = None,
 ) -> tuple[str, list[str | None]]:
     """Generate an answer and per-source section labels from question and retrieved snippets.
     Returns (answer_text, section_labels). section_labels[i] is a short section/context for snippet i, or None.
-    answer_closeness: 0=free, 1=stick to snippet wording."""
+    answer_closeness: 0=free, 1=stick to snippet wording.
+    snippets_block: optional prebuilt format_snippets_block(snippet_texts)."""
     settings = settings or get_settings()
     provider = _resolve_provider(settings)
     num_sources = len(snippet_texts)
@@ -82,39 +492,17 @@ def generate_answer(
     if not snippet_texts:
         return "No relevant snippets found.", []
 
-    snippets_block = "\n\n".join(f"[{i+1}] {t}" for i, t in enumerate(snippet_texts))
-    closeness_instruction = _closeness_system_instruction(answer_closeness)
-    system = get_prompt("answer_generation_system").format(closeness_instruction=closeness_instruction)
-    user = get_prompt("answer_generation_user").format(question=question, snippets_block=snippets_block)
-
-    if provider == "azure":
-        client = _client_azure(settings)
-        if client:
-            try:
-                r = client.chat.completions.create(
-                    model=settings.azure_openai_chat_deployment,
-                    messages=[{"role": "system", "content": system}, {"role": "user", "content": user}],
-                    max_tokens=800,
-                )
-                if r.choices and r.choices[0].message.content:
-                    return _parse_answer_and_sections(r.choices[0].message.content.strip(), num_sources)
-            except Exception as e:
-                logger.warning("Azure OpenAI call failed: %s", e)
-        return snippet_texts[0], [None] * num_sources
-
-    if provider == "ollama":
-        client = _client_ollama(settings)
-        try:
-            r = client.chat.completions.create(
-                model=settings.ollama_chat_model,
-                messages=[{"role": "system", "content": system}, {"role": "user", "content": user}],
-                max_tokens=800,
-            )
-            if r.choices and r.choices[0].message.content:
-                return _parse_answer_and_sections(r.choices[0].message.content.strip(), num_sources)
-        except Exception as e:
-            logger.warning("Ollama call failed (is Ollama running?): %s", e)
-
+    system, user = _answer_prompts(question, snippet_texts, answer_closeness, snippets_block)
+    cache_key = _response_cache_key(settings, provider, system, user)
+    content = _response_cache_get(cache_key)
+    if content is None:
+        content = _chat_complete(
+            system, user, max_tokens=800, settings=settings, provider=provider, what="Answer generation"
+        )
+        if content:
+            _response_cache_put(cache_key, content)
+    if content:
+        return _parse_answer_and_sections(content, num_sources)
     return snippet_texts[0], [None] * num_sources
 
 
@@ -125,55 +513,20 @@ def refine_answer(
     snippet_texts: list[str],
     settings: Settings | None = None,
     answer_closeness: float = 0.5,
+    snippets_block: str | None = None,
 ) -> str:
     """Refine an existing answer based on user feedback and selected snippets.
     Returns the refined answer text."""
     settings = settings or get_settings()
-    provider = _resolve_provider(settings)
 
     if not snippet_texts:
         return original_answer  # Can't refine without context
 
-    snippets_block = "\n\n".join(f"[{i+1}] {t}" for i, t in enumerate(snippet_texts))
-    closeness_instruction = _closeness_system_instruction(answer_closeness)
-
-    system = get_prompt("refine_system").format(closeness_instruction=closeness_instruction)
-    user = get_prompt("refine_user").format(
-        original_question=original_question,
-        original_answer=original_answer,
-        refinement_prompt=refinement_prompt,
-        snippets_block=snippets_block,
+    system, user = _refine_prompts(
+        original_question, original_answer, refinement_prompt, snippet_texts, answer_closeness, snippets_block
     )
-
-    if provider == "azure":
-        client = _client_azure(settings)
-        if client:
-            try:
-                r = client.chat.completions.create(
-                    model=settings.azure_openai_chat_deployment,
-                    messages=[{"role": "system", "content": system}, {"role": "user", "content": user}],
-                    max_tokens=800,
-                )
-                if r.choices and r.choices[0].message.content:
-                    return r.choices[0].message.content.strip()
-            except Exception as e:
-                logger.warning("Azure OpenAI refine call failed: %s", e)
-        return original_answer
-
-    if provider == "ollama":
-        client = _client_ollama(settings)
-        try:
-            r = client.chat.completions.create(
-                model=settings.ollama_chat_model,
-                messages=[{"role": "system", "content": system}, {"role": "user", "content": user}],
-                max_tokens=800,
-            )
-            if r.choices and r.choices[0].message.content:
-                return r.choices[0].message.content.strip()
-        except Exception as e:
-            logger.warning("Ollama refine call failed: %s", e)
-
-    return original_answer
+    content = _chat_complete(system, user, max_tokens=800, settings=settings, what="Refine answer")
+    return content or original_answer
 
 
 def generate_hypothetical_answer(question: str, settings: Settings | None = None) -> str:
@@ -183,37 +536,24 @@ def generate_hypothetical_answer(question: str, settings: Settings | None = None
     if provider == "none":
         return ""
 
-    prompt = get_prompt("hyde_user").format(question=question)
-
-    if provider == "azure":
-        client = _client_azure(settings)
-        if client:
-            try:
-                r = client.chat.completions.create(
-                    model=settings.azure_openai_chat_deployment,
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=150,
-                )
-                if r.choices and r.choices[0].message.content:
-                    return (r.choices[0].message.content or "").strip()
-            except Exception as e:
-                logger.warning("HyDE hypothetical answer (Azure) failed: %s", e)
-        return ""
-
-    if provider == "ollama":
-        client = _client_ollama(settings)
-        try:
-            r = client.chat.completions.create(
-                model=settings.ollama_chat_model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=150,
+    question = " ".join(question.split())
+    template = get_prompt("hyde_user")
+    prompt = template.format(question=question)
+    # Keyed on the template and the case-folded question, so repeats that differ only
+    # in case or whitespace reuse the stored hypothetical
+    cache_key = _response_cache_key(settings, provider, "hyde", template, question.casefold())
+    content = _response_cache_get(cache_key)
+    if content is None:
+        content = llm_cache.get(cache_key)
+        if content is None:
+            content = _raw_chat(
+                _messages(None, prompt), 150, settings, provider, "HyDE hypothetical answer", _DETERMINISTIC_PARAMS
             )
-            if r.choices and r.choices[0].message.content:
-                return (r.choices[0].message.content or "").strip()
-        except Exception as e:
-            logger.warning("HyDE hypothetical answer (Ollama) failed: %s", e)
-
-    return ""
+            if content:
+                llm_cache.put(cache_key, content)
+        if content:
+            _response_cache_put(cache_key, content)
+    return content or ""
 
 
 def generate_example_question(
@@ -238,60 +578,358 @@ def generate_example_question(
     provider = _resolve_provider(settings)
     if provider == "none":
         return ""
-    
-    # Truncate text if too long to fit in context
-    max_text_len = 2000
-    text_for_prompt = snippet_text[:max_text_len]
-    if len(snippet_text) > max_text_len:
-        text_for_prompt += "..."
-    
-    title_context = f" titled '{snippet_title}'" if snippet_title else ""
-    
-    system = get_prompt("example_question_system")
-    user = get_prompt("example_question_user").format(title_context=title_context, text_for_prompt=text_for_prompt)
-    
+
+    system, user = _example_question_prompts(snippet_text, snippet_title)
+    cache_key = _response_cache_key(settings, provider, system, user)
+    content = llm_cache.get(cache_key)
+    if content is None:
+        content = _chat_complete(
+            system, user, max_tokens=100, settings=settings, provider=provider,
+            what="Generate example question", params=_DETERMINISTIC_PARAMS,
+        )
+        if content:
+            llm_cache.put(cache_key, content)
+    return _clean_example_question(content) if content else ""
+
+
+# ---------------------------------------------------------------------------
+# Streaming variants: yield NDJSON-ready events as tokens arrive
+# ---------------------------------------------------------------------------
+
+# Characters held back from each delta so a SECTIONS: marker split across
+# chunks is never forwarded to the client as answer text.
+_SECTIONS_HOLDBACK = 16
+
+
+class _StreamFailed(Exception):
+    """A streamed chat completion broke off; the text yielded so far is incomplete."""
+
+
+def _stream_chat(
+    messages: list[dict],
+    max_tokens: int,
+    settings: Settings,
+    provider: str,
+    what: str,
+) -> Iterator[str]:
+    """Stream one chat completion, yielding content deltas.
+
+    Yields nothing if no LLM is available. Raises _StreamFailed if the request fails,
+    including midway, so callers never mistake a truncated answer for a complete one.
+    """
     if provider == "azure":
-        client = _client_azure(settings)
-        if client:
-            try:
-                r = client.chat.completions.create(
-                    model=settings.azure_openai_chat_deployment,
-                    messages=[
-                        {"role": "system", "content": system},
-                        {"role": "user", "content": user},
-                    ],
-                    max_tokens=100,
-                )
-                if r.choices and r.choices[0].message.content:
-                    question = (r.choices[0].message.content or "").strip()
-                    # Clean up common prefixes
-                    for prefix in ["Question:", "Q:", "Example question:"]:
-                        if question.lower().startswith(prefix.lower()):
-                            question = question[len(prefix):].strip()
-                    return question
-            except Exception as e:
-                logger.warning("Generate example question (Azure) failed: %s", e)
-        return ""
-    
-    if provider == "ollama":
-        client = _client_ollama(settings)
+        client, model, label = _client_azure(settings), settings.azure_openai_chat_deployment, "Azure"
+    elif provider == "ollama":
+        client, model, label = _client_ollama(settings), settings.ollama_chat_model, "Ollama"
+    else:
+        return
+    if client is None:
+        return
+    try:
+        stream = client.chat.completions.create(
+            model=model, messages=messages, max_tokens=max_tokens, stream=True
+        )
         try:
-            r = client.chat.completions.create(
-                model=settings.ollama_chat_model,
-                messages=[
-                    {"role": "system", "content": system},
-                    {"role": "user", "content": user},
-                ],
-                max_tokens=100,
+            for chunk in stream:
+                # Azure sends a leading chunk with no choices (content filter results).
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Closing the response aborts generation if the consumer stopped early.
+            stream.close()
+    except Exception as e:
+        logger.warning("%s (%s, streaming) failed: %s", what, label, e)
+        raise _StreamFailed(str(e)) from e
+
+
+def stream_answer(
+    question: str,
+    snippet_texts: list[str],
+    settings: Settings | None = None,
+    answer_closeness: float = 0.5,
+    snippets_block: str | None = None,
+) -> Iterator[dict]:
+    """Streaming version of generate_answer.
+
+    Yields {"type": "delta", "text": ...} for the answer body as it is generated,
+    then one {"type": "done", "answer": ..., "section_labels": [...]} event. The
+    SECTIONS: trailer is never emitted as a delta; the final event carries the
+    parsed answer and should be treated as authoritative.
+    """
+    settings = settings or get_settings()
+    provider = _resolve_provider(settings)
+    num_sources = len(snippet_texts)
+
+    if not snippet_texts:
+        yield {"type": "done", "answer": "No relevant snippets found.", "section_labels": []}
+        return
+
+    system, user = _answer_prompts(question, snippet_texts, answer_closeness, snippets_block)
+    cache_key = _response_cache_key(settings, provider, system, user)
+    cached = _response_cache_get(cache_key)
+    if cached is not None:
+        answer, sections = _parse_answer_and_sections(cached, num_sources)
+        yield {"type": "delta", "text": answer}
+        yield {"type": "done", "answer": answer, "section_labels": sections}
+        return
+
+    raw = ""
+    sent = 0
+    in_sections = False
+    try:
+        for delta in _stream_chat(
+            _messages(system, user),
+            800, settings, provider, "Answer generation",
+        ):
+            raw += delta
+            if in_sections:
+                continue
+            match = _SECTIONS_RE.search(raw, max(0, sent - _SECTIONS_HOLDBACK))
+            if match:
+                in_sections = True
+                end = match.start()
+            else:
+                end = len(raw) - _SECTIONS_HOLDBACK
+            if end > sent:
+                yield {"type": "delta", "text": raw[sent:end]}
+                sent = end
+    except _StreamFailed:
+        raw = ""  # truncated: don't cache it; fall back like generate_answer
+
+    content = raw.strip()
+    if not content:
+        yield {"type": "done", "answer": snippet_texts[0], "section_labels": [None] * num_sources}
+        return
+    _response_cache_put(cache_key, content)
+    answer, sections = _parse_answer_and_sections(content, num_sources)
+    if not in_sections and sent < len(raw):
+        yield {"type": "delta", "text": raw[sent:]}
+    yield {"type": "done", "answer": answer, "section_labels": sections}
+
+
+def stream_refine_answer(
+    original_question: str,
+    original_answer: str,
+    refinement_prompt: str,
+    snippet_texts: list[str],
+    settings: Settings | None = None,
+    answer_closeness: float = 0.5,
+    snippets_block: str | None = None,
+) -> Iterator[dict]:
+    """Streaming version of refine_answer. Same event shape as stream_answer, without section labels."""
+    settings = settings or get_settings()
+    provider = _resolve_provider(settings)
+
+    if not snippet_texts:
+        yield {"type": "done", "answer": original_answer}
+        return
+
+    system, user = _refine_prompts(
+        original_question, original_answer, refinement_prompt, snippet_texts, answer_closeness, snippets_block
+    )
+    parts: list[str] = []
+    try:
+        for delta in _stream_chat(
+            _messages(system, user),
+            800, settings, provider, "Refine answer",
+        ):
+            parts.append(delta)
+            yield {"type": "delta", "text": delta}
+    except _StreamFailed:
+        parts = []  # truncated: fall back like refine_answer
+    yield {"type": "done", "answer": "".join(parts).strip() or original_answer}
+
+
+# ---------------------------------------------------------------------------
+# Async variants (AsyncOpenAI / AsyncAzureOpenAI) for callers on an event loop
+# ---------------------------------------------------------------------------
+
+# Identical async chat calls already in flight on the same event loop, so concurrent
+# callers share one request instead of each hitting the provider.
+_inflight: dict[tuple[int, str], asyncio.Task] = {}
+
+
+async def _achat(
+    messages: list[dict],
+    max_tokens: int,
+    settings: Settings,
+    provider: str,
+    what: str,
+    params: dict | None = None,
+) -> str | None:
+    """Run one chat completion on the async client. Returns stripped content or None.
+
+    Concurrent calls with the same provider, model, messages and max_tokens are coalesced.
+    """
+    key = (
+        id(asyncio.get_running_loop()),
+        _response_cache_key(settings, provider, *(m["content"] for m in messages), str(max_tokens)),
+    )
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_achat_uncoalesced(messages, max_tokens, settings, provider, what, params))
+        _inflight[key] = task
+        task.add_done_callback(lambda _t: _inflight.pop(key, None))
+    # shield: one caller being cancelled must not cancel the request the others wait on.
+    return await asyncio.shield(task)
+
+
+async def _achat_uncoalesced(
+    messages: list[dict],
+    max_tokens: int,
+    settings: Settings,
+    provider: str,
+    what: str,
+    params: dict | None = None,
+) -> str | None:
+    if provider == "azure":
+        client, model, label = _async_client_azure(settings), settings.azure_openai_chat_deployment, "Azure"
+    elif provider == "ollama":
+        client, model, label = _async_client_ollama(settings), settings.ollama_chat_model, "Ollama"
+    else:
+        return None
+    if client is None:
+        return None
+    try:
+        r = await client.chat.completions.create(
+            model=model, messages=messages, max_tokens=max_tokens, **(params or {})
+        )
+        if r.choices and r.choices[0].message.content:
+            return r.choices[0].message.content.strip()
+    except Exception as e:
+        logger.warning("%s (%s) failed: %s", what, label, e)
+    return None
+
+
+async def agenerate_answer(
+    question: str,
+    snippet_texts: list[str],
+    settings: Settings | None = None,
+    answer_closeness: float = 0.5,
+    snippets_block: str | None = None,
+) -> tuple[str | None, list[str | None]]:
+    """Async version of generate_answer.
+
+    If no answer could be generated, returns (None, [None, ...]) instead of the top
+    snippet, so the caller can apply that fallback without caching it.
+    """
+    settings = settings or get_settings()
+    provider = _resolve_provider(settings)
+    num_sources = len(snippet_texts)
+
+    if not snippet_texts:
+        return "No relevant snippets found.", []
+
+    system, user = _answer_prompts(question, snippet_texts, answer_closeness, snippets_block)
+    cache_key = _response_cache_key(settings, provider, system, user)
+    content = _response_cache_get(cache_key)
+    if content is None:
+        content = await _achat(
+            _messages(system, user),
+            800, settings, provider, "Answer generation",
+        )
+        if content:
+            _response_cache_put(cache_key, content)
+    if content:
+        return _parse_answer_and_sections(content, num_sources)
+    return None, [None] * num_sources
+
+
+async def arefine_answer(
+    original_question: str,
+    original_answer: str,
+    refinement_prompt: str,
+    snippet_texts: list[str],
+    settings: Settings | None = None,
+    answer_closeness: float = 0.5,
+    snippets_block: str | None = None,
+) -> str | None:
+    """Async version of refine_answer.
+
+    Returns None if the answer could not be refined; the caller falls back to
+    original_answer (without caching it).
+    """
+    settings = settings or get_settings()
+    provider = _resolve_provider(settings)
+
+    if not snippet_texts:
+        return None  # Can't refine without context
+
+    system, user = _refine_prompts(
+        original_question, original_answer, refinement_prompt, snippet_texts, answer_closeness, snippets_block
+    )
+    content = await _achat(
+        _messages(system, user),
+        800, settings, provider, "Refine",
+    )
+    return content or None
+
+
+async def agenerate_hypothetical_answer(question: str, settings: Settings | None = None) -> str:
+    """Async version of generate_hypothetical_answer."""
+    settings = settings or get_settings()
+    provider = _resolve_provider(settings)
+    if provider == "none":
+        return ""
+
+    question = " ".join(question.split())
+    template = get_prompt("hyde_user")
+    prompt = template.format(question=question)
+    # Keyed on the template and the case-folded question, so repeats that differ only
+    # in case or whitespace reuse the stored hypothetical
+    cache_key = _response_cache_key(settings, provider, "hyde", template, question.casefold())
+    content = _response_cache_get(cache_key)
+    if content is None:
+        content = llm_cache.get(cache_key)
+        if content is None:
+            content = await _achat(
+                _messages(None, prompt), 150, settings, provider, "HyDE hypothetical answer", _DETERMINISTIC_PARAMS,
             )
-            if r.choices and r.choices[0].message.content:
-                question = (r.choices[0].message.content or "").strip()
-                # Clean up common prefixes
-                for prefix in ["Question:", "Q:", "Example question:"]:
-                    if question.lower().startswith(prefix.lower()):
-                        question = question[len(prefix):].strip()
-                return question
-        except Exception as e:
-            logger.warning("Generate example question (Ollama) failed: %s", e)
-    
-    return ""
+            if content:
+                llm_cache.put(cache_key, content)
+        if content:
+            _response_cache_put(cache_key, content)
+    return content or ""
+
+
+async def agenerate_example_question(
+    snippet_text: str,
+    snippet_title: str | None = None,
+    settings: Settings | None = None,
+) -> str:
+    """Async version of generate_example_question."""
+    settings = settings or get_settings()
+    provider = _resolve_provider(settings)
+    if provider == "none":
+        return ""
+
+    system, user = _example_question_prompts(snippet_text, snippet_title)
+    cache_key = _response_cache_key(settings, provider, system, user)
+    content = llm_cache.get(cache_key)
+    if content is None:
+        content = await _achat(
+            _messages(system, user),
+            100, settings, provider, "Generate example question", _DETERMINISTIC_PARAMS,
+        )
+        if content:
+            llm_cache.put(cache_key, content)
+    return _clean_example_question(content) if content else ""
+
+
+async def generate_example_questions_batch(
+    snippets: list[tuple[str, str | None]],
+    max_concurrency: int = 10,
+    settings: Settings | None = None,
+) -> list[str]:
+    """Generate one example question per (snippet_text, snippet_title), at most
+    *max_concurrency* LLM calls in flight. Results keep input order; failures
+    become empty strings, like generate_example_question."""
+    settings = settings or get_settings()
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def one(text: str, title: str | None) -> str:
+        async with sem:
+            return await agenerate_example_question(text, title, settings)
+
+    results = await asyncio.gather(*(one(text, title) for text, title in snippets), return_exceptions=True)
+    return [r if isinstance(r, str) else "" for r in results]
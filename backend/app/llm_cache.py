@@ -0,0 +1,26 @@
+"""Persistent SQLite cache for deterministic LLM outputs (HyDE answers, example questions).
+
+These calls run with temperature 0 and a fixed seed, so a prompt maps to a stable
+output and can be reused across restarts without calling the provider again.
+"""
+from __future__ import annotations
+
+from .sqlite_cache import SQLiteCache
+
+# Disabled when LLM_CACHE_PATH is empty
+_cache = SQLiteCache("LLM cache", "llm_cache_path", "llm_cache", "TEXT", "content", "TEXT")
+
+
+def get(key: str) -> str | None:
+    """Return cached content for key, or None."""
+    return _cache.get_many([key]).get(key)
+
+
+def put(key: str, content: str) -> None:
+    """Store content for key (overwrites)."""
+    _cache.put_many([(key, content)])
+
+
+def reset() -> None:
+    """Reopen the cache database on next use (after a restore replaced the file)."""
+    _cache.reset()
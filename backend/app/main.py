@@ -1,24 +1,38 @@
 """FastAPI app: /api/ask, /api/snippets, /api/auth, /api/users."""
+import asyncio
+import hashlib
 import io
 import json
 import logging
+import multiprocessing
 import os
 import re
 import shutil
+import sqlite3
+import stat
+import subprocess
 import tarfile
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import Annotated, Any
 
+import orjson
 from fastapi import Depends, File, Form, FastAPI, HTTPException, Query, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
-from .auth import authenticate_user, create_access_token, get_current_admin, get_current_user
-from .config import get_settings
-from .generation import generate_answer, refine_answer
+from .auth import authenticate_user, create_access_token, get_current_admin, get_current_user, invalidate_user_cache
+from .config import Settings, get_settings
+from .generation import aclose_async_clients, agenerate_answer, arefine_answer, stream_answer, stream_refine_answer
 from .models import (
     AskRequest,
     AskResponse,
@@ -30,11 +44,7 @@ from .models import (
     RefineRequest,
     RefineResponse,
     SnippetCreate,
-    SnippetGroupItem,
-    SnippetGroupListResponse,
     SnippetGroupUpdate,
-    SnippetItem,
-    SnippetListResponse,
     SnippetUpdate,
     ExampleQuestionsUpdate,
     SourceItem,
@@ -47,12 +57,17 @@ from .models import (
     UserUpdate,
 )
 from .help_content_store import get_help_content, set_help_content
-from .retrieval import answer_confidence, retrieve_and_score
-from .store import add_snippets, delete_snippet, delete_snippets_by_group, get_linked_snippets, get_snippet_metadata, list_groups, list_snippets, list_snippets_grouped, update_example_questions, update_snippet, update_snippet_grouped
-from .anonymize import anonymize_text
-from .upload import extract_text_from_bytes
+from .retrieval import answer_confidence, aretrieve_and_score, retrieve_and_score
+from .store import add_snippets, delete_snippet, delete_snippets_by_group, get_linked_snippets, get_snippet_metadata, list_groups, list_snippets, list_snippets_grouped, update_example_questions, update_snippet, update_snippet_grouped, warm_up as store_warm_up
+from .anonymize import anonymize_texts
+from . import embed_cache, llm_cache, semantic_cache
+from .embeddings import embed, warm_up as embeddings_warm_up
+from .upload import extract_text_from_path
 from .user_store import count_admins, create_user, delete_user, get_user_by_email, get_user_by_id, init_db, list_users, set_user_role, set_user_status
 
+# Settings are read once at import; handlers use this instead of calling get_settings() per request.
+SETTINGS: Settings = get_settings()
+
 
 def _strip_env_value(s: str | None) -> str | None:
     """Strip whitespace and remove inline # comments (common .env mistake)."""
@@ -117,21 +132,43 @@ def _enforce_jwt_secret() -> None:
         )
 
 
+def _warm_up(what: str, fn) -> None:
+    """Run a startup warm-up step; failures are logged and left to the first request."""
+    try:
+        fn()
+    except Exception as e:
+        logging.warning("%s warm-up failed: %s", what, e)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     _enforce_jwt_secret()
     _configure_logging()
-    init_db()
+    # Independent startup I/O runs concurrently; the admin seed needs the user DB.
+    await asyncio.gather(
+        asyncio.to_thread(init_db),
+        asyncio.to_thread(_warm_up, "Chroma", store_warm_up),
+        asyncio.to_thread(_warm_up, "embedding model", embeddings_warm_up),
+    )
     _seed_admin_if_needed()
-    yield
+    # Worker processes for PDF/DOCX text extraction (CPU-bound). "spawn" so workers
+    # don't inherit the model/DB threads of this process.
+    app.state.extract_pool = ProcessPoolExecutor(
+        max_workers=min(4, os.cpu_count() or 1),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+    try:
+        yield
+    finally:
+        app.state.extract_pool.shutdown(wait=False, cancel_futures=True)
+        await aclose_async_clients()
 
 
-app = FastAPI(title="RAG Snippet Answer API", lifespan=lifespan)
+app = FastAPI(title="RAG Snippet Answer API", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # CORS: configurable via ALLOWED_ORIGINS env var.
 # In single-container production (frontend served from same origin) this is a no-op.
-_settings_cors = get_settings()
-_origins = [o.strip() for o in _settings_cors.allowed_origins.split(",") if o.strip()]
+_origins = [o.strip() for o in SETTINGS.allowed_origins.split(",") if o.strip()]
 if _origins:
     app.add_middleware(
         CORSMiddleware,
@@ -141,14 +178,14 @@ if _origins:
         allow_headers=["*"],
     )
 
-_EMAIL_RE = re.compile(r"^[^\s@]+@[^\s@]+\.[^\s@]+$")
+_EMAIL_RE = re.compile(r"[^\s@]+@[^\s@]+\.[^\s@]+")
 
 
 @app.post("/api/auth/register")
 def register(payload: UserCreate):
     """Register a new user (status=pending). Admin must approve before login."""
     email = payload.email.strip().lower()
-    if not _EMAIL_RE.match(email):
+    if not _EMAIL_RE.fullmatch(email):
         raise HTTPException(status_code=400, detail="Invalid email format")
     if get_user_by_email(email):
         raise HTTPException(status_code=400, detail="Email already registered")
@@ -181,12 +218,29 @@ def get_me(current_user: Annotated[dict, Depends(get_current_user)]):
 
 
 @app.post("/api/ask", response_model=AskResponse)
-def ask(
+async def ask(
     req: AskRequest,
     current_user: Annotated[dict, Depends(get_current_user)],
 ):
     """Retrieve relevant snippets, generate answer, return answer + sources + confidence."""
-    sources = retrieve_and_score(
+    cache_scope = json.dumps([
+        sorted(req.group_names or []),
+        sorted(req.snippet_ids or []),
+        sorted(req.languages or []),
+        req.use_hyde,
+        req.use_keyword_rerank,
+        round(req.answer_closeness, 2),
+    ])
+    kb_version = semantic_cache.kb_version()
+    use_cache = SETTINGS.semantic_cache_enabled
+    if use_cache:
+        # Same text the retrieval step embeds for example question search, so this is a cache hit there.
+        question_emb = (await asyncio.to_thread(embed, [req.question]))[0]
+        cached = semantic_cache.lookup(question_emb, cache_scope)
+        if cached is not None:
+            return cached
+
+    sources = await aretrieve_and_score(
         req.question,
         top_k=5,
         group_names=req.group_names,
@@ -201,34 +255,101 @@ def ask(
             sources=[],
             answer_confidence=0.0,
         )
-    snippet_texts = [s["text"] for s in sources]
-    answer_text, section_labels = generate_answer(
-        req.question, snippet_texts, settings=get_settings(), answer_closeness=req.answer_closeness
+    # One pass over the retrieval results for prompt texts, confidences and response items.
+    snippet_texts: list[str] = []
+    confidences: list[float] = []
+    items: list[SourceItem] = []
+    for s in sources:
+        text, conf, meta = s["text"], s["snippet_confidence"], s.get("metadata")
+        snippet_texts.append(text)
+        confidences.append(conf)
+        items.append(SourceItem(
+            id=s["id"],
+            text=text,
+            title=s.get("title"),
+            snippet_confidence=conf,
+            source_document_url=(meta or {}).get("source_document_url"),
+            metadata=meta,
+        ))
+    answer_text, section_labels = await agenerate_answer(
+        req.question, snippet_texts, settings=SETTINGS, answer_closeness=req.answer_closeness
     )
-    confidences = [s["snippet_confidence"] for s in sources]
-    ans_conf = answer_confidence(confidences)
-    n = len(sources)
-    section_list = (section_labels + [None] * n)[:n]
-    return AskResponse(
-        answer=answer_text,
-        sources=[
-            SourceItem(
-                id=s["id"],
-                text=s["text"],
-                title=s.get("title"),
-                snippet_confidence=s["snippet_confidence"],
-                source_document_url=(s.get("metadata") or {}).get("source_document_url"),
-                section_label=section_list[i] if i < len(section_list) else None,
-                metadata=s.get("metadata"),
-            )
-            for i, s in enumerate(sources)
-        ],
-        answer_confidence=ans_conf,
+    for item, label in zip(items, section_labels):
+        item.section_label = label
+    response = AskResponse(
+        # No LLM answer (unavailable or failed): fall back to the top snippet, uncached
+        answer=answer_text if answer_text is not None else snippet_texts[0],
+        sources=items,
+        answer_confidence=answer_confidence(confidences),
     )
+    if use_cache and answer_text is not None:
+        semantic_cache.store(question_emb, cache_scope, response, version=kb_version)
+    return response
+
+
+def _ndjson(events):
+    """Encode an iterable of event dicts as newline-delimited JSON (UTF-8, via orjson)."""
+    for event in events:
+        yield orjson.dumps(event, option=orjson.OPT_APPEND_NEWLINE)
+
+
+@app.post("/api/ask/stream")
+def ask_stream(
+    req: AskRequest,
+    current_user: Annotated[dict, Depends(get_current_user)],
+):
+    """Like /api/ask, but streams the answer as NDJSON events.
+
+    Emits one "sources" event (sources + answer_confidence), then "delta" events with
+    answer text as it is generated, then a "done" event with the final answer and
+    per-source section labels.
+    """
+    sources = retrieve_and_score(
+        req.question,
+        top_k=5,
+        group_names=req.group_names,
+        snippet_ids=req.snippet_ids,
+        languages=req.languages,
+        use_hyde=req.use_hyde,
+        use_keyword_rerank=req.use_keyword_rerank,
+    )
+
+    def events():
+        if not sources:
+            yield {"type": "sources", "sources": [], "answer_confidence": 0.0}
+            yield {
+                "type": "done",
+                "answer": "No relevant snippets in the knowledge base. Add snippets first.",
+                "section_labels": [],
+            }
+            return
+        yield {
+            "type": "sources",
+            "sources": [
+                SourceItem(
+                    id=s["id"],
+                    text=s["text"],
+                    title=s.get("title"),
+                    snippet_confidence=s["snippet_confidence"],
+                    source_document_url=(s.get("metadata") or {}).get("source_document_url"),
+                    metadata=s.get("metadata"),
+                ).model_dump()
+                for s in sources
+            ],
+            "answer_confidence": answer_confidence([s["snippet_confidence"] for s in sources]),
+        }
+        yield from stream_answer(
+            req.question,
+            [s["text"] for s in sources],
+            settings=SETTINGS,
+            answer_closeness=req.answer_closeness,
+        )
+
+    return StreamingResponse(_ndjson(events()), media_type="application/x-ndjson")
 
 
 @app.post("/api/refine", response_model=RefineResponse)
-def refine(
+async def refine(
     req: RefineRequest,
     current_user: Annotated[dict, Depends(get_current_user)],
 ):
@@ -246,15 +367,37 @@ def refine(
             answer_confidence=0.0,
         )
 
-    snippet_texts = [s.text for s in selected_sources]
-    refined_answer = refine_answer(
-        original_question=req.original_question,
-        original_answer=req.original_answer,
-        refinement_prompt=req.refinement_prompt,
-        snippet_texts=snippet_texts,
-        settings=get_settings(),
-        answer_closeness=req.answer_closeness,
-    )
+    # Bucket by everything except the refinement prompt, which is matched by embedding.
+    cache_scope = "refine:" + hashlib.sha256(json.dumps([
+        req.original_question,
+        req.original_answer,
+        sorted((s.id, s.text) for s in selected_sources),
+        round(req.answer_closeness, 2),
+    ]).encode("utf-8")).hexdigest()
+    kb_version = semantic_cache.kb_version()
+    use_cache = SETTINGS.semantic_cache_enabled
+    # Only the refined text is cached; sources and confidences always come from this request.
+    refined_answer = None
+    if use_cache:
+        prompt_emb = (await asyncio.to_thread(embed, [req.refinement_prompt]))[0]
+        refined_answer = semantic_cache.lookup(prompt_emb, cache_scope, threshold=SETTINGS.semantic_cache_refine_threshold)
+    if refined_answer is None:
+        snippet_texts = [s.text for s in selected_sources]
+        refined_answer = await arefine_answer(
+            original_question=req.original_question,
+            original_answer=req.original_answer,
+            refinement_prompt=req.refinement_prompt,
+            snippet_texts=snippet_texts,
+            settings=SETTINGS,
+            answer_closeness=req.answer_closeness,
+        )
+        if refined_answer is None:
+            refined_answer = req.original_answer  # LLM unavailable or failed; not cached
+        elif use_cache:
+            semantic_cache.store(
+                prompt_emb, cache_scope, refined_answer, version=kb_version,
+                ttl_seconds=SETTINGS.semantic_cache_refine_ttl_seconds,
+            )
 
     # Calculate confidence based on selected sources
     confidences = [s.snippet_confidence for s in selected_sources]
@@ -267,6 +410,40 @@ def refine(
     )
 
 
+@app.post("/api/refine/stream")
+def refine_stream(
+    req: RefineRequest,
+    current_user: Annotated[dict, Depends(get_current_user)],
+):
+    """Like /api/refine, but streams the refined answer as NDJSON "delta" events followed by "done"."""
+    if req.selected_source_ids:
+        selected_sources = [s for s in req.sources if s.id in req.selected_source_ids]
+    else:
+        selected_sources = req.sources
+
+    events = stream_refine_answer(
+        original_question=req.original_question,
+        original_answer=req.original_answer,
+        refinement_prompt=req.refinement_prompt,
+        snippet_texts=[s.text for s in selected_sources],
+        settings=SETTINGS,
+        answer_closeness=req.answer_closeness,
+    )
+    return StreamingResponse(_ndjson(events), media_type="application/x-ndjson")
+
+
+def _snippet_item(s: dict) -> dict:
+    """Store row -> SnippetItem-shaped dict (plain dicts skip per-row model construction)."""
+    return {
+        "id": s["id"],
+        "text": s["text"],
+        "title": s.get("title"),
+        "group": s.get("group"),
+        "metadata": s.get("metadata"),
+        "created_at": None,
+    }
+
+
 @app.get("/api/snippets")
 def get_snippets(
     limit: int = 100,
@@ -290,26 +467,26 @@ def get_snippets(
             group_names=group if group and len(group) > 0 else None,
             languages=language if language and len(language) > 0 else None,
         )
-        return SnippetGroupListResponse(
-            snippets=[
-                SnippetGroupItem(
-                    id=s["id"],
-                    title=s.get("title"),
-                    group=s.get("group"),
-                    metadata=s.get("metadata"),
-                    translations={
-                        lang: TranslationEntry(
-                            text=tr["text"],
-                            example_questions=tr.get("example_questions", []),
-                            is_generated_translation=tr.get("is_generated_translation", False),
-                        )
+        return {
+            "snippets": [
+                {
+                    "id": s["id"],
+                    "title": s.get("title"),
+                    "group": s.get("group"),
+                    "metadata": s.get("metadata"),
+                    "translations": {
+                        lang: {
+                            "text": tr["text"],
+                            "example_questions": tr.get("example_questions", []),
+                            "is_generated_translation": tr.get("is_generated_translation", False),
+                        }
                         for lang, tr in (s.get("translations") or {}).items()
                     },
-                )
+                }
                 for s in snippets
             ],
-            total=total,
-        )
+            "total": total,
+        }
 
     snippets, total = list_snippets(
         limit=limit,
@@ -318,19 +495,7 @@ def get_snippets(
         languages=language if language and len(language) > 0 else None,
         include_translations=include_translations,
     )
-    return SnippetListResponse(
-        snippets=[
-            SnippetItem(
-                id=s["id"],
-                text=s["text"],
-                title=s.get("title"),
-                group=s.get("group"),
-                metadata=s.get("metadata"),
-            )
-            for s in snippets
-        ],
-        total=total,
-    )
+    return {"snippets": [_snippet_item(s) for s in snippets], "total": total}
 
 
 @app.get("/api/groups")
@@ -375,24 +540,29 @@ def post_snippets(
 ):
     """Add one or more snippets. If anonymize=True on any item, PII is replaced with placeholders.
     If skip_translation=True on any item, LLM translation generation is skipped."""
-    settings = get_settings()
+    settings = SETTINGS
     payloads = payload if isinstance(payload, list) else [payload]
     items: list[dict] = []
+    to_anonymize: list[int] = []
     any_skip_translation = False
     for p in payloads:
-        text = p.text
         metadata = dict(p.metadata) if p.metadata else {}
         if p.anonymize and settings.enable_pii_anonymization:
-            text = anonymize_text(text, settings)
+            to_anonymize.append(len(items))
             metadata["anonymized"] = True
         if p.skip_translation:
             any_skip_translation = True
         items.append({
-            "text": text,
+            "text": p.text,
             "title": p.title,
             "metadata": metadata if metadata else None,
             "group": p.group,
         })
+    if to_anonymize:
+        # Anonymize all flagged texts together so short ones share LLM requests
+        anonymized = anonymize_texts([items[i]["text"] for i in to_anonymize], settings)
+        for i, text in zip(to_anonymize, anonymized):
+            items[i]["text"] = text
     ids = add_snippets(items, skip_translation=any_skip_translation)
     return {"ids": ids, "count": len(ids)}
 
@@ -408,8 +578,10 @@ def post_snippet_grouped(
     shared metadata, and a ``translations`` dict keyed by language code.
     Unlike import, this does **not** replace existing snippets in the group.
     """
-    from .store import _chunk_text, _get_collection, _index_example_questions
-    from .embeddings import embed
+    from .store import (
+        _as_chroma_embeddings, _chunk_text, _get_collection, _index_example_questions, _metadata_fields,
+    )
+    from .embeddings import embed_documents
 
     originals = {
         lang: tr for lang, tr in payload.translations.items()
@@ -423,7 +595,7 @@ def post_snippet_grouped(
     if not originals:
         raise HTTPException(status_code=400, detail="At least one non-generated translation is required")
 
-    settings = get_settings()
+    settings = SETTINGS
     chunk_size = settings.chunk_size
     overlap = settings.chunk_overlap
     coll = _get_collection()
@@ -453,7 +625,7 @@ def post_snippet_grouped(
 
     if first_tr.example_questions:
         _index_example_questions(
-            parent_id, first_tr.example_questions, payload.title, payload.group
+            parent_id, first_tr.example_questions, payload.title, payload.group, first_lang
         )
 
     remaining_originals = {
@@ -491,19 +663,20 @@ def post_snippet_grouped(
             if tr.example_questions:
                 enriched["example_questions"] = tr.example_questions
             enriched["translation_source"] = "generated" if is_gen else "original"
-            chunk_meta["metadata_json"] = json.dumps(enriched)
+            chunk_meta.update(_metadata_fields(enriched))
             tr_ids.append(doc_id)
             tr_docs.append(chunk)
             tr_metas.append(chunk_meta)
 
         if tr_ids:
-            embeddings = embed(tr_docs).tolist()
+            embeddings = _as_chroma_embeddings(embed_documents(tr_docs))
             coll.add(ids=tr_ids, embeddings=embeddings, documents=tr_docs, metadatas=tr_metas)
+            semantic_cache.invalidate()
             translation_count += 1
 
         if tr.example_questions:
             _index_example_questions(
-                f"{parent_id}_tr_{lang}", tr.example_questions, payload.title, payload.group
+                f"{parent_id}_tr_{lang}", tr.example_questions, payload.title, payload.group, lang
             )
 
     return {
@@ -560,7 +733,7 @@ def delete_snippet_endpoint(
 ):
     """Delete a snippet by id."""
     delete_snippet(snippet_id)
-    settings = get_settings()
+    settings = SETTINGS
     if settings.upload_dir:
         upload_path = Path(settings.upload_dir) / snippet_id
         if upload_path.exists() and upload_path.is_dir():
@@ -590,13 +763,28 @@ def _sanitize_filename(filename: str) -> str:
     return safe or "document"
 
 
+_CONTENT_TYPES = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
 def _content_type_for_filename(filename: str) -> str:
-    name = (filename or "").lower()
-    if name.endswith(".pdf"):
-        return "application/pdf"
-    if name.endswith(".docx"):
-        return "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-    return "application/octet-stream"
+    return _CONTENT_TYPES.get(Path(filename or "").suffix.lower(), "application/octet-stream")
+
+
+@lru_cache(maxsize=4096)
+def _snippet_document_path(upload_dir: str, snippet_id: str, kb_version: int) -> Path | None:
+    """Stored document for a snippet, resolved once per knowledge base version."""
+    upload_path = Path(upload_dir) / snippet_id
+    filename = (get_snippet_metadata(snippet_id) or {}).get("source_document_filename")
+    if filename:
+        return upload_path / Path(filename).name
+    # Snippets uploaded before the filename was recorded: take the file in the directory
+    if not upload_path.is_dir():
+        return None
+    files = [f for f in upload_path.iterdir() if f.is_file()]
+    return files[0] if files else None
 
 
 @app.get("/api/snippets/{snippet_id}/document")
@@ -605,18 +793,19 @@ def get_snippet_document(
     current_user: Annotated[dict, Depends(get_current_user)] = None,
 ):
     """Serve the stored original document for a snippet (PDF/DOCX) if it exists."""
-    settings = get_settings()
+    settings = SETTINGS
     if not settings.upload_dir:
         raise HTTPException(status_code=404, detail="Document storage not configured")
-    upload_path = Path(settings.upload_dir) / snippet_id
-    if not upload_path.exists() or not upload_path.is_dir():
-        raise HTTPException(status_code=404, detail="Document not found")
-    files = [f for f in upload_path.iterdir() if f.is_file()]
-    if not files:
+    path = _snippet_document_path(settings.upload_dir, snippet_id, semantic_cache.kb_version())
+    # One stat, reused by FileResponse for Content-Length/ETag instead of a second stat
+    try:
+        st = path.stat() if path is not None else None
+    except OSError:
+        st = None
+    if st is None or not stat.S_ISREG(st.st_mode):
         raise HTTPException(status_code=404, detail="Document not found")
-    path = files[0]
     media_type = _content_type_for_filename(path.name)
-    return FileResponse(path, media_type=media_type, filename=path.name)
+    return FileResponse(path, media_type=media_type, filename=path.name, stat_result=st)
 
 
 @app.get("/api/snippets/{snippet_id}/linked")
@@ -630,22 +819,11 @@ def get_snippet_linked(
     Returns list of snippets including the original.
     """
     linked = get_linked_snippets(snippet_id)
-    return {
-        "snippets": [
-            SnippetItem(
-                id=s["id"],
-                text=s["text"],
-                title=s.get("title"),
-                group=s.get("group"),
-                metadata=s.get("metadata"),
-            )
-            for s in linked
-        ]
-    }
+    return {"snippets": [_snippet_item(s) for s in linked]}
 
 
 @app.post("/api/snippets/upload")
-def upload_snippets(
+async def upload_snippets(
     files: list[UploadFile] = File(...),
     group: str | None = Form(None),
     anonymize: bool = Form(False),
@@ -653,13 +831,12 @@ def upload_snippets(
 ):
     """Upload .txt, .docx, or .pdf files; each file becomes one snippet. Title = filename (no extension).
     If anonymize=True, PII (names, addresses, etc.) is replaced with generic placeholders."""
-    items: list[dict] = []
-    file_data: list[tuple[bytes, str]] = []  # (content, filename) for PDF/DOCX only
     errors = []
-    settings = get_settings()
+    settings = SETTINGS
     upload_dir = Path(settings.upload_dir) if settings.upload_dir else None
     do_anonymize = anonymize and settings.enable_pii_anonymization
 
+    accepted: list[UploadFile] = []
     for f in files:
         if not f.filename:
             continue
@@ -667,61 +844,109 @@ def upload_snippets(
         if not (name.endswith(".txt") or name.endswith(".docx") or name.endswith(".pdf")):
             errors.append(f"{f.filename}: only .txt, .docx, and .pdf are allowed")
             continue
-        try:
-            content = f.file.read()
-            text = extract_text_from_bytes(content, f.filename)
+        accepted.append(f)
+
+    # Spool each upload to a temp file on disk, then parse them in parallel in the
+    # extraction process pool (PDF/DOCX parsing is CPU-bound). Temp files of PDF/DOCX
+    # uploads are later moved into upload_dir, so no file is held in memory.
+    tmp_paths = await asyncio.to_thread(_spool_uploads_to_disk, accepted)
+    try:
+        loop = asyncio.get_running_loop()
+        pool = getattr(app.state, "extract_pool", None)
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(pool, extract_text_from_path, path, f.filename)
+                for f, path in zip(accepted, tmp_paths)
+            ),
+            return_exceptions=True,
+        )
+
+        items: list[dict] = []
+        documents: list[tuple[str, str] | None] = []  # (temp path, filename) to keep, per item
+        for f, path, text in zip(accepted, tmp_paths, results):
+            if isinstance(text, BaseException):
+                errors.append(f"{f.filename}: {text}")
+                continue
             if not text.strip():
                 errors.append(f"{f.filename}: file is empty")
                 continue
-            if do_anonymize:
-                text = anonymize_text(text, settings)
             title = f.filename.rsplit(".", 1)[0] if "." in f.filename else f.filename
             metadata = {"anonymized": True} if do_anonymize else None
             items.append({"text": text, "title": title, "metadata": metadata, "group": group})
-            if upload_dir and (name.endswith(".pdf") or name.endswith(".docx")):
-                file_data.append((content, f.filename))
-            else:
-                file_data.append((None, ""))  # one entry per item so index matches
-        except Exception as e:
-            errors.append(f"{f.filename}: {e}")
-
-    if not items:
-        raise HTTPException(
-            status_code=400,
-            detail=errors[0] if errors else "No valid .txt, .docx, or .pdf files provided",
+            name = f.filename.lower()
+            keep = upload_dir and (name.endswith(".pdf") or name.endswith(".docx"))
+            documents.append((path, f.filename) if keep else None)
+
+        if not items:
+            raise HTTPException(
+                status_code=400,
+                detail=errors[0] if errors else "No valid .txt, .docx, or .pdf files provided",
+            )
+        ids = await asyncio.to_thread(
+            _index_uploaded_items, items, documents, upload_dir, do_anonymize, settings
         )
-    ids = add_snippets(items)
+    finally:
+        for path in tmp_paths:
+            Path(path).unlink(missing_ok=True)
+
+    return {"ids": ids, "count": len(ids), "errors": errors if errors else None}
+
 
+def _spool_uploads_to_disk(uploads: list[UploadFile]) -> list[str]:
+    """Copy each upload to its own temp file and return the paths (same order)."""
+    paths: list[str] = []
+    for f in uploads:
+        fd, path = tempfile.mkstemp(suffix=Path(f.filename).suffix.lower())
+        paths.append(path)
+        with os.fdopen(fd, "wb") as out:
+            shutil.copyfileobj(f.file, out, 1 << 20)
+    return paths
+
+
+def _index_uploaded_items(
+    items: list[dict],
+    documents: list[tuple[str, str] | None],
+    upload_dir: Path | None,
+    do_anonymize: bool,
+    settings: Settings,
+) -> list[str]:
+    """Anonymize (optional), store original documents, and index the uploaded snippets."""
+    if do_anonymize:
+        anonymized = anonymize_texts([it["text"] for it in items], settings)
+        for it, text in zip(items, anonymized):
+            it["text"] = text
+
+    # Save original documents under pre-assigned snippet ids first, so the link goes into
+    # the snippet metadata with the single add_snippets call (no re-index per file).
+    saved_dirs: list[Path] = []
     if upload_dir:
         upload_dir.mkdir(parents=True, exist_ok=True)
-        for i, (snippet_id, (content, filename)) in enumerate(zip(ids, file_data)):
-            if content is None or not filename:
+        for item, doc in zip(items, documents):
+            if doc is None:
                 continue
+            tmp_path, filename = doc
+            snippet_id = str(uuid.uuid4())
+            safe_name = _sanitize_filename(filename)
             try:
                 snippet_upload = upload_dir / snippet_id
                 snippet_upload.mkdir(parents=True, exist_ok=True)
-                safe_name = _sanitize_filename(filename)
-                out_path = snippet_upload / safe_name
-                out_path.write_bytes(content)
-                url = f"/api/snippets/{snippet_id}/document"
-                item = items[i]
-                update_snippet(
-                    snippet_id,
-                    item["text"],
-                    item.get("title"),
-                    metadata={"source_document_url": url},
-                    group=item.get("group"),
-                )
-                meta = get_snippet_metadata(snippet_id)
-                if not (meta and meta.get("source_document_url")):
-                    logging.warning(
-                        "Upload: source_document_url not persisted for snippet %s",
-                        snippet_id,
-                    )
+                saved_dirs.append(snippet_upload)
+                shutil.move(tmp_path, snippet_upload / safe_name)
             except Exception:
-                pass  # keep snippet; link not set
+                continue  # keep snippet; link not set
+            item["id"] = snippet_id
+            item["metadata"] = {
+                **(item.get("metadata") or {}),
+                "source_document_url": f"/api/snippets/{snippet_id}/document",
+                "source_document_filename": safe_name,
+            }
 
-    return {"ids": ids, "count": len(ids), "errors": errors if errors else None}
+    try:
+        return add_snippets(items)
+    except Exception:
+        for d in saved_dirs:
+            shutil.rmtree(d, ignore_errors=True)
+        raise
 
 
 @app.get("/api/users", response_model=list[UserResponse])
@@ -751,7 +976,7 @@ def create_user_admin(
     if payload.role not in ("user", "admin"):
         raise HTTPException(status_code=400, detail="role must be 'user' or 'admin'")
     email = payload.email.strip().lower()
-    if not _EMAIL_RE.match(email):
+    if not _EMAIL_RE.fullmatch(email):
         raise HTTPException(status_code=400, detail="Invalid email format")
     if get_user_by_email(email):
         raise HTTPException(status_code=400, detail="Email already registered")
@@ -787,6 +1012,7 @@ def update_user(
         set_user_role(user_id, payload.role)
     if payload.status is not None:
         set_user_status(user_id, payload.status)
+    invalidate_user_cache(user_id)
     updated = get_user_by_id(user_id)
     return UserResponse(
         id=updated["id"],
@@ -809,6 +1035,7 @@ def delete_user_endpoint(
     if target["role"] == "admin" and count_admins() <= 1:
         raise HTTPException(status_code=400, detail="Cannot delete the last admin")
     delete_user(user_id)
+    invalidate_user_cache(user_id)
     return {"ok": True}
 
 
@@ -886,25 +1113,99 @@ def backup_data(
 
     Includes ChromaDB, SQLite user DB, and uploaded documents.
     """
-    settings = get_settings()
+    settings = SETTINGS
     data_dir = Path(settings.chroma_persist_dir).parent
     if not data_dir.is_dir():
         raise HTTPException(status_code=404, detail="Data directory not found")
 
-    buf = io.BytesIO()
-    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
-        tar.add(str(data_dir), arcname="data")
-    buf.seek(0)
-
     ts = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
     filename = f"backup-{ts}.tar.gz"
     return StreamingResponse(
-        buf,
+        _stream_tar_gz(data_dir, arcname="data"),
         media_type="application/gzip",
         headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
 
 
+def _add_tree_with_sqlite_snapshots(tar: tarfile.TarFile, src: Path, arcname: str) -> None:
+    """Add *src* to *tar* like ``tar.add``, but snapshot live SQLite databases.
+
+    A database in WAL mode keeps committed rows in its ``-wal`` file until a checkpoint,
+    so copying the .db and the -wal one after the other isn't a consistent pair. Files
+    with a ``-wal`` sibling (users.db, the LLM/embedding caches) are copied with SQLite's
+    online backup API instead, and their -wal/-shm files are left out.
+    """
+    for root, dirs, files in os.walk(src):
+        dirs.sort()
+        root_path = Path(root)
+        arc_root = (Path(arcname) / root_path.relative_to(src)).as_posix()
+        tar.add(root, arcname=arc_root, recursive=False)
+        for name in sorted(files):
+            path = root_path / name
+            if name.endswith(("-wal", "-shm")) and (root_path / name[:-4]).is_file():
+                continue
+            if (root_path / f"{name}-wal").exists():
+                _add_sqlite_snapshot(tar, path, f"{arc_root}/{name}")
+            else:
+                tar.add(str(path), arcname=f"{arc_root}/{name}", recursive=False)
+
+
+def _add_sqlite_snapshot(tar: tarfile.TarFile, db_path: Path, arcname: str) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        copy_path = Path(tmp) / db_path.name
+        src_conn = sqlite3.connect(str(db_path))
+        dst_conn = sqlite3.connect(str(copy_path))
+        try:
+            src_conn.backup(dst_conn)
+        finally:
+            dst_conn.close()
+            src_conn.close()
+        tar.add(str(copy_path), arcname=arcname)
+
+
+def _stream_tar_gz(src: Path, arcname: str, chunk_size: int = 1 << 20):
+    """Yield a .tar.gz of *src* as it is produced.
+
+    A background thread writes the archive in streaming mode (no seeks) into a pipe;
+    memory use stays constant and the first bytes go out before the archive is
+    complete. When ``pigz`` is on PATH the thread writes a plain tar into it so
+    compression runs on all cores; otherwise tarfile's single-threaded "w|gz" is used.
+    If the client disconnects, the writer stops on the broken pipe.
+    """
+    pigz = shutil.which("pigz")
+    if pigz:
+        proc = subprocess.Popen([pigz, "-c"], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        sink, mode, out = proc.stdin, "w|", proc.stdout
+    else:
+        proc = None
+        read_fd, write_fd = os.pipe()
+        sink, mode, out = os.fdopen(write_fd, "wb"), "w|gz", os.fdopen(read_fd, "rb")
+
+    def produce():
+        try:
+            with sink as w, tarfile.open(fileobj=w, mode=mode) as tar:
+                _add_tree_with_sqlite_snapshots(tar, src, arcname)
+        except BrokenPipeError:
+            pass  # client went away
+        except Exception:
+            logging.exception("Backup archive failed")
+
+    producer = threading.Thread(target=produce, name="backup-tar", daemon=True)
+    producer.start()
+    finished = False
+    try:
+        with out as r:
+            while chunk := r.read(chunk_size):
+                yield chunk
+        finished = True
+    finally:
+        if proc is not None:
+            if not finished:
+                proc.kill()
+            proc.wait()
+        producer.join()
+
+
 @app.post("/api/admin/restore")
 def restore_data(
     current_user: Annotated[dict, Depends(get_current_admin)],
@@ -921,56 +1222,75 @@ def restore_data(
     if not file.filename or not file.filename.endswith((".tar.gz", ".tgz")):
         raise HTTPException(status_code=400, detail="File must be a .tar.gz archive")
 
-    settings = get_settings()
+    settings = SETTINGS
     data_dir = Path(settings.chroma_persist_dir).resolve().parent  # e.g. /app/data
 
-    # Reset ChromaDB so it releases file handles before we overwrite
+    # Reset ChromaDB, the SQLite pool and the on-disk caches so they release file handles before we overwrite
     from .store import reset_client
+    from .user_store import reset_pool
     reset_client()
-
-    content = file.file.read()
-    buf = io.BytesIO(content)
-
+    reset_pool()
+    llm_cache.reset()
+    embed_cache.reset()
+
+    # Extract member by member straight from the upload's spooled file ("r|gz" never
+    # seeks), into a staging dir inside data/ so the final moves are same-filesystem
+    # renames even when data/ is a mounted volume.
+    data_dir.mkdir(parents=True, exist_ok=True)
+    staging = data_dir / ".restore-tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir()
     try:
-        with tarfile.open(fileobj=buf, mode="r:gz") as tar:
-            # Security: reject absolute paths and path traversal
-            for member in tar.getmembers():
+        with tarfile.open(fileobj=file.file, mode="r|gz") as tar:
+            for member in tar:
+                # Security: reject absolute paths and path traversal
                 if member.name.startswith("/") or ".." in member.name:
                     raise HTTPException(
                         status_code=400,
                         detail=f"Unsafe path in archive: {member.name}",
                     )
-
-            # Extract to a temp directory first, then move into place
-            import tempfile
-            with tempfile.TemporaryDirectory() as tmpdir:
-                tar.extractall(path=tmpdir)
-
-                # Find the extracted data dir (could be "data" or just files)
-                extracted = Path(tmpdir) / "data"
-                if not extracted.is_dir():
-                    # Fallback: maybe the tar root IS the data contents
-                    extracted = Path(tmpdir)
-
-                # Remove existing data and move extracted in
-                if data_dir.is_dir():
-                    shutil.rmtree(data_dir)
-                shutil.copytree(str(extracted), str(data_dir))
+                if hasattr(tarfile, "data_filter"):
+                    tar.extract(member, path=staging, filter="data")
+                else:
+                    tar.extract(member, path=staging)
+
+        # Find the extracted data dir (could be "data" or just files)
+        extracted = staging / "data"
+        if not extracted.is_dir():
+            # Fallback: maybe the tar root IS the data contents
+            extracted = staging
+
+        # Replace existing data with the extracted contents
+        for child in data_dir.iterdir():
+            if child == staging:
+                continue
+            if child.is_dir() and not child.is_symlink():
+                shutil.rmtree(child)
+            else:
+                child.unlink()
+        for child in list(extracted.iterdir()):
+            if child != staging / "data":
+                os.replace(child, data_dir / child.name)
 
     except tarfile.TarError as e:
-        # Ensure data dir exists even if restore fails
-        data_dir.mkdir(parents=True, exist_ok=True)
         raise HTTPException(status_code=400, detail=f"Invalid tar archive: {e}")
     except HTTPException:
         raise
     except Exception as e:
-        data_dir.mkdir(parents=True, exist_ok=True)
         logging.exception("Restore failed")
         raise HTTPException(status_code=500, detail=f"Restore failed: {e}")
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
 
+    # Cache connections reopened by requests during the restore still point at the old files
+    llm_cache.reset()
+    embed_cache.reset()
     # Re-initialise SQLite (creates tables if needed) and seed admin
     init_db()
     _seed_admin_if_needed()
+    invalidate_user_cache()
+    # Reconnect now; also tags example questions from older backups with their language
+    _warm_up("Chroma", store_warm_up)
 
     return {"ok": True, "message": "Data restored successfully. ChromaDB will reconnect on next request."}
 
@@ -1033,10 +1353,12 @@ def import_collection(
         if count > 0:
             replaced_groups.append(g)
 
-    from .store import _chunk_text, _get_collection, _index_example_questions
-    from .embeddings import embed
+    from .store import (
+        _as_chroma_embeddings, _chunk_text, _get_collection, _index_example_questions, _metadata_fields,
+    )
+    from .embeddings import embed_documents
 
-    settings = get_settings()
+    settings = SETTINGS
     chunk_size = settings.chunk_size
     overlap = settings.chunk_overlap
     coll = _get_collection()
@@ -1085,7 +1407,7 @@ def import_collection(
 
         if first_tr.example_questions:
             _index_example_questions(
-                parent_id, first_tr.example_questions, entry.title, entry.group
+                parent_id, first_tr.example_questions, entry.title, entry.group, first_lang
             )
 
         remaining_originals = {
@@ -1122,19 +1444,20 @@ def import_collection(
                 if tr.example_questions:
                     enriched["example_questions"] = tr.example_questions
                 enriched["translation_source"] = "generated" if is_gen else "original"
-                chunk_meta["metadata_json"] = json.dumps(enriched)
+                chunk_meta.update(_metadata_fields(enriched))
                 tr_ids.append(doc_id)
                 tr_docs.append(chunk)
                 tr_metas.append(chunk_meta)
 
             if tr_ids:
-                embeddings = embed(tr_docs).tolist()
+                embeddings = _as_chroma_embeddings(embed_documents(tr_docs))
                 coll.add(ids=tr_ids, embeddings=embeddings, documents=tr_docs, metadatas=tr_metas)
+                semantic_cache.invalidate()
                 total_translations += 1
 
             if tr.example_questions:
                 _index_example_questions(
-                    f"{parent_id}_tr_{lang}", tr.example_questions, entry.title, entry.group
+                    f"{parent_id}_tr_{lang}", tr.example_questions, entry.title, entry.group, lang
                 )
 
     return {
@@ -1208,10 +1531,9 @@ def health_ready():
     errors: list[str] = []
     # Check SQLite
     try:
-        from .user_store import _get_connection
-        conn = _get_connection()
-        conn.execute("SELECT 1")
-        conn.close()
+        from .user_store import acquire
+        with acquire() as conn:
+            conn.execute("SELECT 1")
     except Exception as e:
         errors.append(f"sqlite: {e}")
     # Check ChromaDB
@@ -1231,14 +1553,45 @@ def health_ready():
 # ---------------------------------------------------------------------------
 _STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
 
-if _STATIC_DIR.is_dir():
-    # Serve static assets (JS, CSS, images, etc.)
-    app.mount("/assets", StaticFiles(directory=_STATIC_DIR / "assets"), name="static-assets")
-
-    @app.get("/{full_path:path}")
-    def serve_spa(full_path: str):
-        """Serve the SPA index.html for any non-API route (client-side routing)."""
-        file_path = _STATIC_DIR / full_path
-        if full_path and file_path.is_file():
-            return FileResponse(file_path)
-        return FileResponse(_STATIC_DIR / "index.html")
+class _SPAStaticFiles(StaticFiles):
+    """StaticFiles for the built SPA: unknown non-API paths get index.html (client-side routing).
+
+    The fallback index.html is read once and served from memory with an ETag, so
+    client-side navigations neither reopen the file nor re-download it when unchanged.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        root = Path(self.directory)
+        self._index_html = (root / "index.html").read_bytes()
+        self._index_etag = '"' + hashlib.sha256(self._index_html).hexdigest()[:32] + '"'
+        # Built assets are immutable per deploy: paths not in this set are client-side
+        # routes and get index.html without touching the disk.
+        self._files = frozenset(
+            os.path.normpath(p.relative_to(root)) for p in root.rglob("*") if p.is_file()
+        )
+
+    def _index_response(self, scope) -> Response:
+        headers = {"ETag": self._index_etag, "Cache-Control": "no-cache"}
+        if Headers(scope=scope).get("if-none-match") == self._index_etag:
+            return Response(status_code=304, headers=headers)
+        return Response(self._index_html, media_type="text/html", headers=headers)
+
+    async def get_response(self, path: str, scope):
+        if path != "." and path not in self._files and not path.startswith("api/"):
+            return self._index_response(scope)
+        try:
+            response = await super().get_response(path, scope)
+        except StarletteHTTPException as exc:
+            if exc.status_code != 404 or path.startswith("api/"):
+                raise
+            return self._index_response(scope)
+        if response.status_code == 404 and not path.startswith("api/"):
+            return self._index_response(scope)
+        return response
+
+
+if (_STATIC_DIR / "index.html").is_file():
+    # Mounted last so /api/* and /health* routes match first; files are served by
+    # Starlette directly instead of through a Python catch-all route.
+    app.mount("/", _SPAStaticFiles(directory=_STATIC_DIR, html=True), name="spa")
@@ -1,8 +1,11 @@
 """Pydantic request/response models."""
-from typing import Any
+from typing import Annotated, Any
 
 from pydantic import BaseModel, Field
 
+# Shared constrained type for all confidence scores (one schema instead of one per field)
+Confidence = Annotated[float, Field(ge=0, le=1)]
+
 
 class AskRequest(BaseModel):
     question: str = Field(..., min_length=1)
@@ -18,7 +21,7 @@ class SourceItem(BaseModel):
     id: str
     text: str
     title: str | None = None
-    snippet_confidence: float = Field(..., ge=0, le=1)
+    snippet_confidence: Confidence
     source_document_url: str | None = None
     section_label: str | None = None
     metadata: dict[str, Any] | None = None  # includes language, heading, category, etc.
@@ -27,7 +30,7 @@ class SourceItem(BaseModel):
 class AskResponse(BaseModel):
     answer: str
     sources: list[SourceItem]
-    answer_confidence: float = Field(..., ge=0, le=1)
+    answer_confidence: Confidence
 
 
 class SnippetCreate(BaseModel):
@@ -116,7 +119,7 @@ class RefineResponse(BaseModel):
     """Response with refined answer."""
     answer: str
     sources: list[SourceItem]  # Sources that were used (selected ones)
-    answer_confidence: float = Field(..., ge=0, le=1)
+    answer_confidence: Confidence
 
 
 # Prompt management (admin)
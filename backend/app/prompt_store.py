@@ -6,6 +6,7 @@ import logging
 from dataclasses import dataclass, field
 from pathlib import Path
 
+from . import semantic_cache
 from .config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -29,7 +30,6 @@ PROMPT_DEFAULTS: dict[str, PromptDef] = {
         default=(
             "You are a helpful assistant that writes polite, casual email replies in the same language as the user's input. "
             "Answer the user's question using the provided numbered snippets. "
-            "{closeness_instruction} "
             "IMPORTANT formatting rules:\n"
             "1. Try to extract the sender's name from the input text. First look for a 'Von:'/'From:' line or email signature. "
             "If not found, fall back to the name used in the greeting/salutation of the input (e.g. 'Lieber Herr Meier' → the sender signed or was addressed as 'Meier'). "
@@ -42,7 +42,8 @@ PROMPT_DEFAULTS: dict[str, PromptDef] = {
             "4. If the snippets do not contain the answer, politely say so.\n"
             "5. After your complete email, on a new line write exactly SECTIONS: and then one line per snippet in order (snippet 1, 2, ...): "
             "a very short section or context for each snippet (e.g. 'Scrum Roles - Product Owner' or 'Definition of Done'). "
-            "One line per snippet, no numbers or bullets."
+            "One line per snippet, no numbers or bullets.\n"
+            "{closeness_instruction}"
         ),
     ),
     "closeness_instruction": PromptDef(
@@ -64,11 +65,11 @@ PROMPT_DEFAULTS: dict[str, PromptDef] = {
         placeholders=["{closeness_instruction}"],
         default=(
             "You are refining an existing email reply based on user feedback. "
-            "{closeness_instruction} "
             "Use the provided snippets as context. "
             "Keep the polite, casual email tone of the original answer. "
             "The refined answer must remain a ready-to-paste email reply with greeting but without a closing sign-off (the user adds their own). "
-            "Produce only the improved email reply without any explanations or meta-commentary."
+            "Produce only the improved email reply without any explanations or meta-commentary. "
+            "{closeness_instruction}"
         ),
     ),
     "answer_generation_user": PromptDef(
@@ -151,6 +152,8 @@ def _load_overrides() -> dict[str, str]:
 def _save_overrides(overrides: dict[str, str]) -> None:
     path = _prompts_path()
     path.write_text(json.dumps(overrides, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    # Cached answers were generated with the old prompts
+    semantic_cache.invalidate()
 
 
 def get_prompt(key: str) -> str:
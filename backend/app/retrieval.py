@@ -1,13 +1,19 @@
 """Retrieve snippets and compute confidence scores."""
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 
-from .config import get_settings
+import numpy as np
+
+from . import semantic_cache
+from .config import Settings, get_settings
 from .embeddings import embed
 from .generation import generate_hypothetical_answer
-from .store import query_snippets, query_example_questions
+from .store import get_snippets_by_ids, query_snippets, query_example_questions
 
 logger = logging.getLogger(__name__)
 
@@ -20,18 +26,37 @@ def _distance_to_confidence(distance: float) -> float:
     return max(0.0, min(1.0, 1.0 - (distance / 2.0)))
 
 
-def _keyword_score(question: str, snippet_text: str) -> float:
-    """Score [0,1] by fraction of question tokens found in snippet (case-insensitive)."""
-    if not question or not snippet_text:
-        return 0.0
-    tokens = set(re.findall(r"\w+", question.lower()))
-    if not tokens:
+def _distances_to_confidences(distances: list[float]) -> list[float]:
+    """Vector form of _distance_to_confidence for a whole result list."""
+    if not distances:
+        return []
+    return np.clip(1.0 - np.asarray(distances, dtype=np.float64) * 0.5, 0.0, 1.0).tolist()
+
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _tokens(text: str) -> set[str]:
+    """Lowercased word tokens of text."""
+    return set(_WORD_RE.findall(text.lower())) if text else set()
+
+
+def _keyword_score(question: str | set[str], snippet_text: str) -> float:
+    """Score [0,1] by fraction of question tokens that are also snippet tokens (case-insensitive).
+
+    question may be passed pre-tokenized (see _tokens) to tokenize it once per rerank.
+    """
+    tokens = question if isinstance(question, set) else _tokens(question)
+    if not tokens or not snippet_text:
         return 0.0
-    snippet_lower = snippet_text.lower()
-    hits = sum(1 for t in tokens if t in snippet_lower)
+    hits = len(tokens & _tokens(snippet_text))
     return min(1.0, hits / len(tokens))
 
 
+_MERGE_SOURCES = ("snippet_text", "example_question", "both")
+_SRC_SNIPPET, _SRC_EXAMPLE, _SRC_BOTH = range(3)
+
+
 def _merge_snippet_and_example_results(
     snippet_results: list[dict],
     example_question_results: list[dict],
@@ -41,7 +66,7 @@ def _merge_snippet_and_example_results(
     """Merge results from snippet search and example question search.
     
     Strategy:
-    - Build a dict by snippet_id
+    - Index candidates by snippet_id into parallel score arrays
     - For snippets found in both searches, boost the score
     - For snippets only in example questions, we need to fetch their full details
     - Rank by combined confidence score
@@ -52,83 +77,89 @@ def _merge_snippet_and_example_results(
         top_k: Number of results to return
         eq_weight: Weight for example question score (default 0.3)
     """
-    by_snippet: dict[str, dict] = {}
+    # Parallel arrays (one slot per snippet id); dicts are only built for the winners.
+    index: dict[str, int] = {}
+    rows: list[dict] = []  # snippet row, or the first example question row for eq-only ids
+    snippet_conf: list[float] = []
+    eq_conf: list[float] = []
+    source: list[int] = []  # index into _MERGE_SOURCES
+    matched: list[str | None] = []
     
     # Add snippet text search results
-    for r in snippet_results:
-        sid = r["id"]
-        snippet_conf = _distance_to_confidence(r["distance"])
-        by_snippet[sid] = {
-            "id": sid,
-            "text": r["text"],
-            "title": r.get("title"),
-            "metadata": r.get("metadata"),
-            "distance": r["distance"],
-            "snippet_conf": snippet_conf,
-            "eq_conf": 0.0,
-            "source": "snippet_text",
-            "matched_question": None,
-        }
+    for r, conf in zip(snippet_results, _distances_to_confidences([r["distance"] for r in snippet_results])):
+        i = index.setdefault(r["id"], len(rows))
+        if i == len(rows):
+            rows.append(r)
+            snippet_conf.append(conf)
+            eq_conf.append(0.0)
+            source.append(_SRC_SNIPPET)
+            matched.append(None)
+        else:
+            rows[i], snippet_conf[i] = r, conf
     
     # Add/merge example question search results
-    for eq in example_question_results:
-        sid = eq["snippet_id"]
-        eq_conf = _distance_to_confidence(eq["distance"])
-        
-        if sid in by_snippet:
-            # Found in both - merge and mark as "both"
-            by_snippet[sid]["eq_conf"] = max(by_snippet[sid]["eq_conf"], eq_conf)
-            by_snippet[sid]["source"] = "both"
-            if by_snippet[sid]["matched_question"] is None:
-                by_snippet[sid]["matched_question"] = eq["question"]
-        else:
+    eq_confs = _distances_to_confidences([eq["distance"] for eq in example_question_results])
+    for eq, conf in zip(example_question_results, eq_confs):
+        i = index.get(eq["snippet_id"])
+        if i is None:
             # Only in example questions - need to fetch snippet later
-            by_snippet[sid] = {
-                "id": sid,
-                "text": None,  # Will be fetched
-                "title": eq.get("title"),
-                "metadata": None,
-                "distance": eq["distance"],
-                "snippet_conf": 0.0,
-                "eq_conf": eq_conf,
-                "source": "example_question",
-                "matched_question": eq["question"],
-            }
+            index[eq["snippet_id"]] = len(rows)
+            rows.append(eq)
+            snippet_conf.append(0.0)
+            eq_conf.append(conf)
+            source.append(_SRC_EXAMPLE)
+            matched.append(eq["question"])
+            continue
+        eq_conf[i] = max(eq_conf[i], conf)
+        if source[i] == _SRC_SNIPPET:
+            source[i] = _SRC_BOTH
+        if matched[i] is None:
+            matched[i] = eq["question"]
     
-    # Calculate combined score: weighted combination
-    # If found in both, we use weighted sum; if only one source, use that score
-    snippet_weight = 1.0 - eq_weight
-    for sid, r in by_snippet.items():
-        if r["source"] == "both":
-            # Boost for appearing in both searches
-            r["combined_conf"] = snippet_weight * r["snippet_conf"] + eq_weight * r["eq_conf"]
-        elif r["source"] == "snippet_text":
-            r["combined_conf"] = r["snippet_conf"]
-        else:  # example_question only
-            r["combined_conf"] = r["eq_conf"]
+    if not rows:
+        return []
+    # Found in both: weighted sum; only one source: that source's score
+    s_conf = np.asarray(snippet_conf)
+    e_conf = np.asarray(eq_conf)
+    src = np.asarray(source)
+    combined = np.where(
+        src == _SRC_BOTH,
+        (1.0 - eq_weight) * s_conf + eq_weight * e_conf,
+        np.where(src == _SRC_SNIPPET, s_conf, e_conf),
+    )
+    # Top_k by combined confidence (descending, ties in insertion order)
+    top = np.arange(len(rows))
+    if len(rows) > top_k:
+        top = np.argpartition(-combined, top_k - 1)[:top_k]
+    top = top[np.lexsort((top, -combined[top]))]
     
-    # Sort by combined confidence (descending) and take top_k
-    sorted_results = sorted(by_snippet.values(), key=lambda x: x["combined_conf"], reverse=True)
-    return sorted_results[:top_k]
+    out = []
+    for i in top.tolist():
+        r = rows[i]
+        from_snippet = source[i] != _SRC_EXAMPLE
+        out.append({
+            "id": r["id"] if from_snippet else r["snippet_id"],
+            "text": r["text"] if from_snippet else None,  # eq-only: fetched later
+            "title": r.get("title"),
+            "metadata": r.get("metadata") if from_snippet else None,
+            "distance": r["distance"],
+            "snippet_conf": snippet_conf[i],
+            "eq_conf": eq_conf[i],
+            "combined_conf": float(combined[i]),
+            "source": _MERGE_SOURCES[source[i]],
+            "matched_question": matched[i],
+        })
+    return out
 
 
 def _fetch_missing_snippet_details(results: list[dict], languages: list[str] | None = None) -> list[dict]:
     """Fetch full snippet details for results that only came from example question search."""
-    from .store import query_snippets
-    
     # Find snippet IDs that need fetching (text is None)
     missing_ids = [r["id"] for r in results if r.get("text") is None]
     if not missing_ids:
         return results
     
-    # Fetch by embedding a dummy query and filtering by IDs
-    # This is a workaround - ideally we'd have a get_snippets_by_ids function
-    # For now, use the existing infrastructure
-    from .store import list_snippets
-    
-    # Fetch all snippets that match the missing IDs
-    all_snippets, _ = list_snippets(limit=1000, languages=languages)
-    snippet_map = {s["id"]: s for s in all_snippets if s["id"] in missing_ids}
+    snippet_map = {s["id"]: s for s in get_snippets_by_ids(missing_ids, languages=languages)}
     
     # Fill in missing details
     for r in results:
@@ -144,6 +175,10 @@ def _fetch_missing_snippet_details(results: list[dict], languages: list[str] | N
     return results
 
 
+# Example question searches for the sync retrieve_and_score (async path uses to_thread)
+_SEARCH_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="eq-search")
+
+
 def retrieve_and_score(
     question: str,
     top_k: int = 5,
@@ -173,53 +208,177 @@ def retrieve_and_score(
         use_example_question_search: Whether to also search example questions (hybrid mode)
     """
     settings = get_settings()
-    
+    enable_eq_search, fetch_k = _search_params(settings, top_k, use_keyword_rerank, use_example_question_search)
+    scope = _cache_scope(top_k, group_names, snippet_ids, languages, use_hyde, use_keyword_rerank, enable_eq_search)
+    kb_version = semantic_cache.kb_version()
+    question_emb = embed([question])[0]
+    cached = semantic_cache.lookup(question_emb, scope, threshold=settings.semantic_cache_retrieval_threshold)
+    if cached is not None:
+        return [dict(r) for r in cached]
+
+    # Path 2: Example question search (direct question embedding) runs in the background
+    # while path 1 waits on the HyDE LLM round-trip.
+    eq_future = (
+        _SEARCH_POOL.submit(_example_question_search, question_emb, fetch_k, group_names, snippet_ids, languages)
+        if enable_eq_search else None
+    )
+    # Path 1: Snippet text search (with HyDE if enabled)
+    snippet_results = _snippet_text_search(
+        question, settings, fetch_k, group_names, snippet_ids, languages, use_hyde, question_emb
+    )
+    example_question_results = eq_future.result() if eq_future is not None else []
+    out = _rank_results(
+        question, snippet_results, example_question_results, settings, top_k, fetch_k, languages, use_keyword_rerank
+    )
+    semantic_cache.store(question_emb, scope, [dict(r) for r in out], version=kb_version)
+    return out
+
+
+async def aretrieve_and_score(
+    question: str,
+    top_k: int = 5,
+    group_names: list[str] | None = None,
+    snippet_ids: list[str] | None = None,
+    languages: list[str] | None = None,
+    use_hyde: bool = False,
+    use_keyword_rerank: bool = True,
+    use_example_question_search: bool = True,
+) -> list[dict]:
+    """Async version of retrieve_and_score.
+
+    The snippet text path (HyDE LLM call + embedding + search) and the example question
+    path run concurrently in worker threads, so the example question search overlaps
+    the HyDE round-trip instead of waiting for it.
+    """
+    settings = get_settings()
+    enable_eq_search, fetch_k = _search_params(settings, top_k, use_keyword_rerank, use_example_question_search)
+    scope = _cache_scope(top_k, group_names, snippet_ids, languages, use_hyde, use_keyword_rerank, enable_eq_search)
+    kb_version = semantic_cache.kb_version()
+    question_emb = (await asyncio.to_thread(embed, [question]))[0]
+    cached = semantic_cache.lookup(question_emb, scope, threshold=settings.semantic_cache_retrieval_threshold)
+    if cached is not None:
+        return [dict(r) for r in cached]
+
+    snippet_task = asyncio.to_thread(
+        _snippet_text_search, question, settings, fetch_k, group_names, snippet_ids, languages, use_hyde, question_emb
+    )
+    if enable_eq_search:
+        snippet_results, example_question_results = await asyncio.gather(
+            snippet_task,
+            asyncio.to_thread(_example_question_search, question_emb, fetch_k, group_names, snippet_ids, languages),
+        )
+    else:
+        snippet_results, example_question_results = await snippet_task, []
+    out = await asyncio.to_thread(
+        _rank_results,
+        question, snippet_results, example_question_results, settings, top_k, fetch_k, languages, use_keyword_rerank,
+    )
+    semantic_cache.store(question_emb, scope, [dict(r) for r in out], version=kb_version)
+    return out
+
+
+def _cache_scope(
+    top_k: int,
+    group_names: list[str] | None,
+    snippet_ids: list[str] | None,
+    languages: list[str] | None,
+    use_hyde: bool,
+    use_keyword_rerank: bool,
+    enable_eq_search: bool,
+) -> str:
+    """Semantic cache scope for retrieval results: every option that changes them."""
+    return "retrieve:" + json.dumps([
+        top_k,
+        sorted(group_names or []),
+        sorted(snippet_ids or []),
+        sorted(languages or []),
+        use_hyde,
+        use_keyword_rerank,
+        enable_eq_search,
+    ])
+
+
+def _search_params(
+    settings: Settings, top_k: int, use_keyword_rerank: bool, use_example_question_search: bool
+) -> tuple[bool, int]:
+    """Return (enable_eq_search, fetch_k) for a retrieval request."""
     # Check if example question search is enabled
     enable_eq_search = (
         use_example_question_search 
         and getattr(settings, 'enable_example_question_search', True)
     )
-    eq_weight = getattr(settings, 'example_question_search_weight', 0.3)
-    
-    # Path 1: Snippet text search (with HyDE if enabled)
-    query_text = question
+    fetch_k = top_k * 2 if (use_keyword_rerank or enable_eq_search) else top_k
+    return enable_eq_search, fetch_k
+
+
+def _snippet_text_search(
+    question: str,
+    settings: Settings,
+    fetch_k: int,
+    group_names: list[str] | None,
+    snippet_ids: list[str] | None,
+    languages: list[str] | None,
+    use_hyde: bool,
+    question_emb: np.ndarray,
+) -> list[dict]:
+    """Search snippet text with the question embedding, or with the HyDE hypothetical answer's."""
+    query_emb = question_emb
     if use_hyde and settings.hyde_enabled:
         hypothetical = generate_hypothetical_answer(question, settings)
-        if hypothetical:
-            query_text = hypothetical
+        if hypothetical and hypothetical != question:
+            query_emb = embed([hypothetical])[0]
             logger.debug("Using HyDE hypothetical answer for snippet search")
     
-    hyde_emb = embed([query_text])[0].tolist()
-    fetch_k = top_k * 2 if (use_keyword_rerank or enable_eq_search) else top_k
-    
-    snippet_results = query_snippets(
+    hyde_emb = query_emb.tolist()
+    return query_snippets(
         hyde_emb,
         top_k=fetch_k,
         group_names=group_names,
         snippet_ids=snippet_ids,
         languages=languages,
     )
-    
-    # Path 2: Example question search (direct question embedding)
-    example_question_results = []
-    if enable_eq_search:
-        # Embed the raw question (not the HyDE hypothetical)
-        q_emb_direct = embed([question])[0].tolist()
-        example_question_results = query_example_questions(
-            q_emb_direct,
-            top_k=fetch_k,
-            group_names=group_names,
-            snippet_ids=snippet_ids,
+
+
+def _example_question_search(
+    question_emb: np.ndarray,
+    fetch_k: int,
+    group_names: list[str] | None,
+    snippet_ids: list[str] | None,
+    languages: list[str] | None,
+) -> list[dict]:
+    """Search example questions with the raw question's embedding (not the HyDE hypothetical)."""
+    q_emb_direct = question_emb.tolist()
+    example_question_results = query_example_questions(
+        q_emb_direct,
+        top_k=fetch_k,
+        group_names=group_names,
+        snippet_ids=snippet_ids,
+        languages=languages,
+    )
+    if example_question_results:
+        logger.debug(
+            "Found %d example question matches, top match: %s",
+            len(example_question_results),
+            example_question_results[0].get("question", "")[:50],
         )
-        if example_question_results:
-            logger.debug(
-                "Found %d example question matches, top match: %s",
-                len(example_question_results),
-                example_question_results[0].get("question", "")[:50] if example_question_results else "",
-            )
-    
+    return example_question_results
+
+
+def _rank_results(
+    question: str,
+    snippet_results: list[dict],
+    example_question_results: list[dict],
+    settings: Settings,
+    top_k: int,
+    fetch_k: int,
+    languages: list[str] | None,
+    use_keyword_rerank: bool,
+) -> list[dict]:
+    """Merge both search paths, rerank, and build the output list."""
+    eq_weight = getattr(settings, 'example_question_search_weight', 0.3)
+
     # Merge results from both paths
-    if enable_eq_search and example_question_results:
+    if example_question_results:
         merged = _merge_snippet_and_example_results(
             snippet_results, 
             example_question_results,
@@ -235,37 +394,50 @@ def retrieve_and_score(
     
     # Apply keyword reranking if enabled
     if use_keyword_rerank and len(raw) > top_k:
-        for r in raw:
-            # Use combined_conf if available (from merge), else compute from distance
-            base_conf = r.get("combined_conf") or _distance_to_confidence(r.get("distance", 0))
-            kw = _keyword_score(question, r.get("text") or "")
-            r["_combined"] = 0.7 * base_conf + 0.3 * kw
-        raw = sorted(raw, key=lambda x: x["_combined"], reverse=True)[:top_k]
-        for r in raw:
-            r.pop("_combined", None)
+        # Use combined_conf if available (from merge), else compute from distance
+        base = np.fromiter(
+            (r.get("combined_conf") or _distance_to_confidence(r.get("distance", 0)) for r in raw),
+            dtype=np.float32, count=len(raw),
+        )
+        order = np.argsort(-base, kind="stable")
+        head = base[order[: top_k + 1]]
+        # Keyword scores are in [0, 1], so 0.3 * kw moves a candidate by at most 0.3. If every
+        # adjacent gap in 0.7 * base (top_k + 1 best) exceeds that, the rerank can't reorder them.
+        if top_k > 0 and np.all(0.7 * (head[:-1] - head[1:]) > 0.3):
+            raw = [raw[i] for i in order[:top_k]]
+        else:
+            question_tokens = _tokens(question)
+            kw = np.fromiter(
+                (_keyword_score(question_tokens, r.get("text") or "") for r in raw),
+                dtype=np.float32, count=len(raw),
+            )
+            scores = 0.7 * base + 0.3 * kw
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+            raw = [raw[i] for i in top[np.argsort(-scores[top], kind="stable")]]
     else:
         raw = raw[:top_k]
     
-    # Build output
-    out = []
-    for r in raw:
-        # Use combined_conf if available, else compute from distance
-        conf = r.get("combined_conf") or _distance_to_confidence(r.get("distance", 0))
-        result = {
+    # Build output in one pass; combined_conf if available, else computed from distance,
+    # rounded for all results at once. Source info is included for debugging/transparency.
+    confs = np.round(
+        np.fromiter(
+            (r.get("combined_conf") or _distance_to_confidence(r.get("distance", 0)) for r in raw),
+            dtype=np.float64, count=len(raw),
+        ),
+        4,
+    ).tolist()
+    return [
+        {
             "id": r["id"],
             "text": r["text"],
             "title": r.get("title"),
             "metadata": r.get("metadata"),
-            "snippet_confidence": round(conf, 4),
+            "snippet_confidence": conf,
+            **({"retrieval_source": r["source"]} if r.get("source") else {}),
+            **({"matched_example_question": r["matched_question"]} if r.get("matched_question") else {}),
         }
-        # Include source info for debugging/transparency
-        if r.get("source"):
-            result["retrieval_source"] = r["source"]
-        if r.get("matched_question"):
-            result["matched_example_question"] = r["matched_question"]
-        out.append(result)
-    
-    return out
+        for r, conf in zip(raw, confs)
+    ]
 
 
 def answer_confidence(snippet_confidences: list[float]) -> float:
@@ -0,0 +1,114 @@
+"""In-process semantic cache for /api/ask and /api/refine: reuse answers for near-duplicate requests.
+
+Entries are keyed by the normalized question embedding plus a scope string (filters and
+answer options). A lookup hits when an entry in the same scope has cosine similarity
+>= SEMANTIC_CACHE_THRESHOLD and is younger than SEMANTIC_CACHE_TTL_SECONDS. Any change
+to the knowledge base or prompts calls invalidate(), which bumps kb_version so older
+entries can never match.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+import numpy as np
+
+from .config import get_settings
+
+_lock = threading.Lock()
+_kb_version = 0
+_next_id = 0
+# id -> (embedding, scope, kb_version, expires_at, value); ordered by last use (LRU last)
+_entries: OrderedDict[int, tuple[np.ndarray, str, int, float, Any]] = OrderedDict()
+# scope -> ids of its entries (insertion order), so a lookup only scores its own scope
+_scopes: dict[str, dict[int, None]] = {}
+
+
+def _remove(eid: int) -> None:
+    entry = _entries.pop(eid)
+    ids = _scopes.get(entry[1])
+    if ids is not None:
+        ids.pop(eid, None)
+        if not ids:
+            del _scopes[entry[1]]
+
+
+def kb_version() -> int:
+    """Current knowledge base version (incremented on every invalidate())."""
+    return _kb_version
+
+
+def invalidate() -> None:
+    """Drop all cached answers. Call after snippets, example questions or prompts change."""
+    global _kb_version
+    with _lock:
+        _kb_version += 1
+        _entries.clear()
+        _scopes.clear()
+
+
+def _normalize(embedding) -> np.ndarray:
+    vec = np.asarray(embedding, dtype=np.float32).ravel()
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm > 0 else vec
+
+
+def lookup(embedding, scope: str, threshold: float | None = None) -> Any | None:
+    """Return the cached value for the most similar question in scope, or None.
+
+    threshold overrides SEMANTIC_CACHE_THRESHOLD for this lookup.
+    """
+    settings = get_settings()
+    if not settings.semantic_cache_enabled:
+        return None
+    vec = _normalize(embedding)
+    now = time.monotonic()
+    with _lock:
+        ids = _scopes.get(scope)
+        if not ids:
+            return None
+        for eid in [eid for eid in ids if _entries[eid][3] <= now]:
+            _remove(eid)
+        candidates = [(eid, _entries[eid]) for eid in _scopes.get(scope, ())]
+        candidates = [(eid, e) for eid, e in candidates if e[2] == _kb_version and e[0].shape == vec.shape]
+        if not candidates:
+            return None
+        scores = np.stack([e[0] for _, e in candidates]) @ vec
+        best = int(np.argmax(scores))
+        if threshold is None:
+            threshold = settings.semantic_cache_threshold
+        if scores[best] < threshold:
+            return None
+        eid, entry = candidates[best]
+        _entries.move_to_end(eid)
+        return entry[4]
+
+
+def store(
+    embedding, scope: str, value: Any, version: int | None = None, ttl_seconds: float | None = None
+) -> None:
+    """Cache value for this question embedding and scope.
+
+    Pass the kb_version() read before retrieval as version so an answer computed while
+    the knowledge base changed is not cached. ttl_seconds overrides SEMANTIC_CACHE_TTL_SECONDS.
+    """
+    global _next_id
+    settings = get_settings()
+    if not settings.semantic_cache_enabled:
+        return
+    if ttl_seconds is None:
+        ttl_seconds = settings.semantic_cache_ttl_seconds
+    vec = _normalize(embedding)
+    vec.setflags(write=False)
+    with _lock:
+        if version is not None and version != _kb_version:
+            return
+        _next_id += 1
+        _entries[_next_id] = (
+            vec, scope, _kb_version, time.monotonic() + ttl_seconds, value
+        )
+        _scopes.setdefault(scope, {})[_next_id] = None
+        while len(_entries) > settings.semantic_cache_max_size:
+            _remove(next(iter(_entries)))
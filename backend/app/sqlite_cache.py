@@ -0,0 +1,88 @@
+"""Small persistent key/value table in SQLite, shared by llm_cache and embed_cache.
+
+Each thread keeps its own connection. The database runs in WAL mode, so a writer
+doesn't block concurrent readers. An empty path in settings disables the cache, and
+SQLite errors are logged and treated as a miss (or a dropped write).
+"""
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# SQLite's default limit on host parameters is 999 on older builds
+_SELECT_BATCH = 900
+
+
+class SQLiteCache:
+    """Key/value table *table* (columns key, *value_column*) in the database at settings.<path_setting>."""
+
+    def __init__(self, name: str, path_setting: str, table: str, key_type: str, value_column: str, value_type: str):
+        self.name = name
+        self._path_setting = path_setting
+        self._schema = f"CREATE TABLE IF NOT EXISTS {table} (key {key_type} PRIMARY KEY, {value_column} {value_type} NOT NULL)"
+        self._select = f"SELECT key, {value_column} FROM {table} WHERE key IN "
+        self._insert = f"INSERT OR REPLACE INTO {table} (key, {value_column}) VALUES (?, ?)"
+        self._local = threading.local()
+        # Bumped by reset(); each thread reopens its connection when it sees a new generation
+        self._generation = 0
+
+    def _connection(self) -> sqlite3.Connection | None:
+        """Return this thread's connection, or None when the cache path is empty."""
+        path = getattr(get_settings(), self._path_setting)
+        if not path:
+            return None
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            if self._local.path == path and self._local.generation == self._generation:
+                return conn
+            self._local.conn = None
+            conn.close()
+        p = Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(p))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(self._schema)
+        conn.commit()
+        self._local.conn, self._local.path, self._local.generation = conn, path, self._generation
+        return conn
+
+    def reset(self) -> None:
+        """Make every thread reopen its connection (e.g. after the database file was replaced).
+
+        Connections belong to their thread, so each one is closed by its owner on next use.
+        """
+        self._generation += 1
+
+    def get_many(self, keys: list) -> dict:
+        """Return {key: value} for the keys that are cached."""
+        found: dict = {}
+        try:
+            conn = self._connection()
+            if conn is None:
+                return found
+            for start in range(0, len(keys), _SELECT_BATCH):
+                batch = keys[start : start + _SELECT_BATCH]
+                rows = conn.execute(f"{self._select}({','.join('?' * len(batch))})", batch).fetchall()
+                found.update(rows)
+        except sqlite3.Error as e:
+            logger.warning("%s read failed: %s", self.name, e)
+        return found
+
+    def put_many(self, items: Iterable[tuple]) -> None:
+        """Store (key, value) pairs, overwriting existing keys."""
+        try:
+            conn = self._connection()
+            if conn is None:
+                return
+            conn.executemany(self._insert, items)
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning("%s write failed: %s", self.name, e)
@@ -1,16 +1,21 @@
 """ChromaDB store for snippets with chunking, groups, and translation indexing."""
 from __future__ import annotations
 
-import json
 import logging
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 import chromadb
+import numpy as np
+import orjson
 from chromadb.config import Settings as ChromaSettings
 
+from . import semantic_cache
 from .config import get_settings
-from .embeddings import embed
+from .embeddings import embed_documents
 
 logger = logging.getLogger(__name__)
 
@@ -21,9 +26,21 @@ def _get_chroma_path() -> Path:
     return p
 
 
+# Chroma 0.5+ takes embeddings as a float32 ndarray; 0.4 validates nested lists of
+# Python floats, so only convert (N*dim float objects) when the installed version needs it.
+_CHROMA_ACCEPTS_NDARRAY = tuple(int(p) for p in chromadb.__version__.split(".")[:2] if p.isdigit()) >= (0, 5)
+
+
+def _as_chroma_embeddings(vectors: np.ndarray):
+    return vectors if _CHROMA_ACCEPTS_NDARRAY else vectors.tolist()
+
+
 _client: chromadb.PersistentClient | None = None
 _collection_name = "snippets"
 _example_questions_collection_name = "example_questions"
+# Collection handles, fetched once per client (get_or_create_collection hits Chroma's sysdb)
+_snippets_coll = None
+_eq_coll = None
 
 
 def _get_client() -> chromadb.PersistentClient:
@@ -42,23 +59,39 @@ def reset_client() -> None:
     Call this after restoring data from a backup so the client picks up
     the new database files.
     """
-    global _client
+    global _client, _snippets_coll, _eq_coll
     _client = None
+    _snippets_coll = None
+    _eq_coll = None
+    semantic_cache.invalidate()
 
 
 def _get_collection():
-    return _get_client().get_or_create_collection(
-        _collection_name,
-        metadata={"description": "Text snippets for RAG"},
-    )
+    global _snippets_coll
+    if _snippets_coll is None:
+        _snippets_coll = _get_client().get_or_create_collection(
+            _collection_name,
+            metadata={"description": "Text snippets for RAG"},
+        )
+    return _snippets_coll
 
 
 def _get_example_questions_collection():
     """Get or create the example questions collection for hybrid search."""
-    return _get_client().get_or_create_collection(
-        _example_questions_collection_name,
-        metadata={"description": "Example questions linked to snippets for hybrid retrieval"},
-    )
+    global _eq_coll
+    if _eq_coll is None:
+        _eq_coll = _get_client().get_or_create_collection(
+            _example_questions_collection_name,
+            metadata={"description": "Example questions linked to snippets for hybrid retrieval"},
+        )
+    return _eq_coll
+
+
+def warm_up() -> None:
+    """Open the Chroma client and both collections (startup warm-up)."""
+    _get_collection().count()
+    _get_example_questions_collection().count()
+    _backfill_example_question_languages()
 
 
 def _index_example_questions(
@@ -66,6 +99,7 @@ def _index_example_questions(
     example_questions: list[str],
     title: str = "",
     group: str = "",
+    language: str = "",
 ) -> None:
     """Embed and store example questions for a snippet in the example_questions collection.
     
@@ -74,40 +108,91 @@ def _index_example_questions(
         example_questions: List of example question strings
         title: Snippet title (for metadata)
         group: Snippet group (for filtering)
+        language: Language of the snippet variant (for filtering)
     """
-    if not example_questions:
-        return
-    
-    # Filter out empty questions
-    questions = [q.strip() for q in example_questions if q and q.strip()]
-    if not questions:
+    _index_example_questions_many([(snippet_id, example_questions, title, group, language)])
+
+
+def _prepare_example_questions(
+    entries: list[tuple[str, list[str], str, str, str]],
+) -> tuple[list[str], list[str], list[dict]]:
+    """Build (ids, documents, metadatas) for example questions of several snippets.
+
+    Each entry is (snippet_id, example_questions, title, group, language).
+    """
+    eq_ids: list[str] = []
+    eq_docs: list[str] = []
+    eq_metadatas: list[dict] = []
+    for snippet_id, example_questions, title, group, language in entries:
+        # Filter out empty questions
+        questions = [q.strip() for q in example_questions or [] if q and q.strip()]
+        for i, q in enumerate(questions):
+            eq_ids.append(f"{snippet_id}_eq_{i}")
+            eq_docs.append(q)
+            eq_metadatas.append({
+                "snippet_id": snippet_id,
+                "question_index": str(i),
+                "title": title,
+                "group": group,
+                "language": (language or "").lower(),
+            })
+    return eq_ids, eq_docs, eq_metadatas
+
+
+def _upsert_example_questions(
+    eq_ids: list[str], eq_docs: list[str], eq_metadatas: list[dict], eq_embeddings: np.ndarray
+) -> None:
+    """Write prepared example questions with their embeddings."""
+    if not eq_ids:
         return
-    
-    eq_coll = _get_example_questions_collection()
-    
-    # Generate IDs and metadata for each question
-    eq_ids = [f"{snippet_id}_eq_{i}" for i in range(len(questions))]
-    eq_metadatas = [
-        {
-            "snippet_id": snippet_id,
-            "question_index": str(i),
-            "title": title,
-            "group": group,
-        }
-        for i in range(len(questions))
-    ]
-    
-    # Embed all questions
-    eq_embeddings = embed(questions).tolist()
-    
-    # Store in collection
-    eq_coll.upsert(
+    _get_example_questions_collection().upsert(
         ids=eq_ids,
-        embeddings=eq_embeddings,
-        documents=questions,
+        embeddings=_as_chroma_embeddings(eq_embeddings),
+        documents=eq_docs,
         metadatas=eq_metadatas,
     )
-    logger.info("Indexed %d example questions for snippet %s", len(questions), snippet_id)
+    semantic_cache.invalidate()
+
+
+def _index_example_questions_many(entries: list[tuple[str, list[str], str, str, str]]) -> None:
+    """Index example questions for several snippets with one embed call and one upsert.
+
+    Each entry is (snippet_id, example_questions, title, group, language).
+    """
+    eq_ids, eq_docs, eq_metadatas = _prepare_example_questions(entries)
+    if not eq_ids:
+        return
+    _upsert_example_questions(eq_ids, eq_docs, eq_metadatas, embed_documents(eq_docs))
+    logger.info("Indexed %d example questions for %d snippet(s)", len(eq_ids), len(entries))
+
+
+def _example_question_language(snippet_id: str) -> str:
+    """Language of the snippet variant that example questions belong to ("" if unknown)."""
+    if "_tr_" in snippet_id:
+        return snippet_id.split("_tr_", 1)[1].lower()
+    return ((get_snippet_metadata(snippet_id) or {}).get("language") or "").lower()
+
+
+def _backfill_example_question_languages() -> None:
+    """Tag example questions indexed without a language (missing or empty), so language filters keep them."""
+    eq_coll = _get_example_questions_collection()
+    result = eq_coll.get(include=["metadatas"])
+    ids: list[str] = []
+    metadatas: list[dict] = []
+    for eq_id, meta in zip(result["ids"] or [], result["metadatas"] or []):
+        meta = meta or {}
+        if meta.get("language"):
+            continue
+        # Rows indexed with an empty language are repaired too, if the snippet's language is known
+        language = _example_question_language(meta.get("snippet_id", ""))
+        if not language and "language" in meta:
+            continue
+        ids.append(eq_id)
+        metadatas.append({**meta, "language": language})
+    if ids:
+        eq_coll.update(ids=ids, metadatas=metadatas)
+        semantic_cache.invalidate()
+        logger.info("Tagged %d example questions with their snippet language", len(ids))
 
 
 def _delete_example_questions(snippet_id: str) -> None:
@@ -116,18 +201,70 @@ def _delete_example_questions(snippet_id: str) -> None:
     eq_result = eq_coll.get(where={"snippet_id": snippet_id}, include=[])
     if eq_result["ids"]:
         eq_coll.delete(ids=eq_result["ids"])
+        semantic_cache.invalidate()
         logger.info("Deleted %d example questions for snippet %s", len(eq_result["ids"]), snippet_id)
 
 
+def _delete_example_questions_bulk(snippet_ids: list[str], batch_size: int = 1000) -> int:
+    """Delete example questions of many snippets with one get/delete per batch of ids.
+
+    Returns the number of example questions deleted.
+    """
+    eq_coll = _get_example_questions_collection()
+    deleted = 0
+    for start in range(0, len(snippet_ids), batch_size):
+        batch = snippet_ids[start : start + batch_size]
+        eq_result = eq_coll.get(where={"snippet_id": {"$in": batch}}, include=[])
+        if eq_result["ids"]:
+            eq_coll.delete(ids=eq_result["ids"])
+            deleted += len(eq_result["ids"])
+    if deleted:
+        semantic_cache.invalidate()
+    return deleted
+
+
+# User metadata is stored as native Chroma fields: scalars under a "md_" prefix (so they
+# can't clash with title/group/parent_id), lists/dicts/None in one JSON field.
+# Chunks written before this keep their whole metadata in "metadata_json".
+_MD_PREFIX = "md_"
+_MD_NESTED_KEY = "metadata_nested_json"
+
+
+def _metadata_fields(metadata: dict) -> dict:
+    """Encode user metadata as Chroma metadata fields (see _read_metadata)."""
+    fields: dict = {}
+    nested: dict = {}
+    for k, v in metadata.items():
+        if isinstance(v, (str, int, float, bool)):
+            fields[_MD_PREFIX + k] = v
+        else:
+            nested[k] = v
+    if nested:
+        fields[_MD_NESTED_KEY] = orjson.dumps(nested).decode()
+    return fields
+
+
+def _read_metadata(meta: dict) -> dict | None:
+    """Return the user metadata stored on a chunk, or None if it has none."""
+    legacy = meta.get("metadata_json")
+    if legacy is not None:
+        return _parse_metadata_json(legacy)
+    out = {k[len(_MD_PREFIX):]: v for k, v in meta.items() if k.startswith(_MD_PREFIX)}
+    nested = meta.get(_MD_NESTED_KEY)
+    if nested:
+        out.update(_parse_metadata_json(nested) or {})
+    return out or None
+
+
 def _parse_metadata_json(md) -> dict | None:
-    """Parse metadata_json from Chroma metadata; return None on missing or invalid."""
+    """Parse a JSON metadata field; return None on missing or invalid."""
     if md is None:
         return None
     s = md if isinstance(md, str) else str(md)
     if not s.strip():
         return None
     try:
-        out = json.loads(s)
+        out = orjson.loads(s)
         return out if isinstance(out, dict) else None
     except (TypeError, ValueError):
         return None
@@ -139,15 +276,13 @@ def _chunk_text(text: str, chunk_size: int, overlap: int) -> list[str]:
         return [text] if text else []
     if len(text) <= chunk_size:
         return [text]
-    chunks = []
-    start = 0
-    while start < len(text):
-        end = start + chunk_size
-        chunks.append(text[start:end])
-        if end >= len(text):
-            break
-        start = end - overlap
-    return chunks
+    # Chunk starts advance by chunk_size - overlap; the last chunk is the first reaching the end
+    step = max(1, chunk_size - overlap)
+    return [text[start : start + chunk_size] for start in range(0, len(text) - chunk_size + step, step)]
+
+
+# Language codes recognised as "-xx" suffixes on linked snippet titles
+_LINKED_TITLE_LANGUAGES = frozenset({"de", "en", "fr", "it", "es", "pt", "nl", "pl", "ru", "zh", "ja", "ko"})
 
 
 def _extract_languages_from_linked_snippets(linked_snippets: list[str]) -> set[str]:
@@ -161,17 +296,21 @@ def _extract_languages_from_linked_snippets(linked_snippets: list[str]) -> set[s
         if not title:
             continue
         # Check for language suffix like "-de", "-en", "-fr", "-it"
-        for lang in ["de", "en", "fr", "it", "es", "pt", "nl", "pl", "ru", "zh", "ja", "ko"]:
-            if title.lower().endswith(f"-{lang}"):
-                languages.add(lang)
-                break
+        suffix = title[-3:].lower()
+        if suffix[:1] == "-" and suffix[1:] in _LINKED_TITLE_LANGUAGES:
+            languages.add(suffix[1:])
     return languages
 
 
+# LLM translation requests in flight at once while indexing a batch of snippets
+_TRANSLATION_CONCURRENCY = 8
+
+
 def add_snippets(items: list[dict], skip_translation: bool = False) -> list[str]:
     """Add snippets with optional translation indexing.
     
-    Each item: {text, title?, metadata?, group?}.
+    Each item: {text, title?, metadata?, group?, id?}. ``id`` lets the caller choose the
+    parent_id up front (e.g. to store an uploaded document under it); otherwise a UUID is used.
     Returns list of logical snippet ids (parent_id).
     
     Translation indexing behavior:
@@ -202,12 +341,16 @@ def add_snippets(items: list[dict], skip_translation: bool = False) -> list[str]
     all_docs: list[str] = []
     all_metadatas: list[dict] = []
     parent_ids_ordered: list[str] = []
+    eq_entries: list[tuple[str, list[str], str, str, str]] = []
 
     # Track which linked groups already have translations being generated in this batch.
     # Key: frozenset of all titles in the linked group (including self).
     # Value: set of language codes that are already covered or being generated.
     linked_group_covered: dict[frozenset, set[str]] = {}
 
+    # Phase 1: detect languages and decide which translations each snippet needs.
+    # (parent_id, text, title, group, metadata, original_language, languages to translate)
+    plans: list[tuple[str, str, str, str, dict, str, list[str]]] = []
     for it in items:
         text = (it.get("text") or "").strip()
         if not text:
@@ -215,7 +358,7 @@ def add_snippets(items: list[dict], skip_translation: bool = False) -> list[str]
         title = it.get("title") or ""
         group = it.get("group") or ""
         metadata = it.get("metadata") or {}
-        parent_id = str(uuid.uuid4())
+        parent_id = it.get("id") or str(uuid.uuid4())
         parent_ids_ordered.append(parent_id)
 
         covered_languages: set[str] = set()
@@ -227,6 +370,8 @@ def add_snippets(items: list[dict], skip_translation: bool = False) -> list[str]
             logger.info("Detected language '%s' for snippet %s", original_language, parent_id)
         elif not original_language:
             original_language = "en"  # default
+        if metadata.get("example_questions"):
+            eq_entries.append((parent_id, metadata["example_questions"], title, group, original_language))
         
         # Add the snippet's own language to covered languages
         covered_languages.add(original_language)
@@ -246,25 +391,16 @@ def add_snippets(items: list[dict], skip_translation: bool = False) -> list[str]
                 already_generating = linked_group_covered.get(group_key, set())
                 covered_languages.update(already_generating)
 
-        # Prepare text variants: original + translations for MISSING languages only
-        text_variants: list[tuple[str, str, bool, str]] = [
-            (text, original_language, False, "original")
-        ]  # (text, lang, is_translation, translation_source)
-        
         # Determine which languages need LLM translation
         missing_languages = target_languages - covered_languages
+        to_translate: list[str] = []
         
         if enable_translation and missing_languages:
-            # Generate LLM translations only for missing languages
             logger.info(
                 "Snippet %s: covered=%s, missing=%s, will generate translations for missing",
                 parent_id, covered_languages, missing_languages,
             )
-            translations = get_translations(text, original_language, settings=settings)
-            for lang, translated_text in translations.items():
-                if lang in missing_languages and translated_text:
-                    text_variants.append((translated_text, lang, True, "generated"))
-                    logger.info("Added %s translation (LLM-generated) for snippet %s", lang, parent_id)
+            to_translate = sorted(missing_languages)
         elif linked_snippets and not missing_languages:
             logger.info(
                 "Snippet %s has all target languages covered (linked + batch): %s",
@@ -274,9 +410,32 @@ def add_snippets(items: list[dict], skip_translation: bool = False) -> list[str]
         # Record which languages this snippet covers for its linked group,
         # so sibling snippets in the same batch won't duplicate translations.
         if group_key is not None:
-            generated_langs = {lang for _, lang, is_tr, _ in text_variants if is_tr}
             existing = linked_group_covered.get(group_key, set())
-            linked_group_covered[group_key] = existing | covered_languages | generated_langs
+            linked_group_covered[group_key] = existing | covered_languages | set(to_translate)
+
+        plans.append((parent_id, text, title, group, metadata, original_language, to_translate))
+
+    # Phase 2: LLM translations for all snippets, several requests in flight at once
+    translations_by_plan: dict[int, dict[str, str]] = {}
+    jobs = [i for i, plan in enumerate(plans) if plan[6]]
+    if jobs:
+        def _translate(i: int) -> dict[str, str]:
+            _, text, _, _, _, original_language, to_translate = plans[i]
+            return get_translations(text, original_language, to_translate, settings=settings)
+
+        with ThreadPoolExecutor(max_workers=min(_TRANSLATION_CONCURRENCY, len(jobs))) as ex:
+            translations_by_plan = dict(zip(jobs, ex.map(_translate, jobs)))
+
+    # Phase 3: chunk originals and translations
+    for i, (parent_id, text, title, group, metadata, original_language, to_translate) in enumerate(plans):
+        # Text variants: original + translations for MISSING languages only
+        text_variants: list[tuple[str, str, bool, str]] = [
+            (text, original_language, False, "original")
+        ]  # (text, lang, is_translation, translation_source)
+        for lang, translated_text in translations_by_plan.get(i, {}).items():
+            if lang in to_translate and translated_text:
+                text_variants.append((translated_text, lang, True, "generated"))
+                logger.info("Added %s translation (LLM-generated) for snippet %s", lang, parent_id)
 
         # Process each text variant (original + translations)
         for variant_text, variant_lang, is_translation, translation_source in text_variants:
@@ -306,7 +465,7 @@ def add_snippets(items: list[dict], skip_translation: bool = False) -> list[str]
                     "language": variant_lang,
                     "translation_source": translation_source,  # "original", "existing", or "generated"
                 }
-                meta["metadata_json"] = json.dumps(enriched_metadata)
+                meta.update(_metadata_fields(enriched_metadata))
                 
                 all_ids.append(doc_id)
                 all_docs.append(chunk)
@@ -315,19 +474,19 @@ def add_snippets(items: list[dict], skip_translation: bool = False) -> list[str]
     if not all_ids:
         return []
 
-    all_embeddings = embed(all_docs).tolist()
+    # One embed call for every chunk and every example question in the batch
+    eq_ids, eq_docs, eq_metadatas = _prepare_example_questions(eq_entries)
+    embeddings = embed_documents(all_docs + eq_docs)
+    all_embeddings, eq_embeddings = embeddings[: len(all_docs)], embeddings[len(all_docs):]
 
     coll = _get_collection()
-    coll.add(ids=all_ids, embeddings=all_embeddings, documents=all_docs, metadatas=all_metadatas)
+    coll.add(ids=all_ids, embeddings=_as_chroma_embeddings(all_embeddings), documents=all_docs, metadatas=all_metadatas)
+    semantic_cache.invalidate()
     
-    # Index example questions for each snippet (for hybrid search)
-    for it, parent_id in zip(items, parent_ids_ordered):
-        metadata = it.get("metadata") or {}
-        example_questions = metadata.get("example_questions", [])
-        if example_questions:
-            title = it.get("title") or ""
-            group = it.get("group") or ""
-            _index_example_questions(parent_id, example_questions, title, group)
+    # Index example questions for all snippets (for hybrid search)
+    _upsert_example_questions(eq_ids, eq_docs, eq_metadatas, eq_embeddings)
+    if eq_ids:
+        logger.info("Indexed %d example questions for %d snippet(s)", len(eq_ids), len(eq_entries))
     
     return parent_ids_ordered
 
@@ -348,7 +507,15 @@ def _expand_chunks_to_parents(
     """
     if not raw_results:
         return []
-    parent_ids = list({r.get("parent_id") or r["id"] for r in raw_results})
+    # Best (smallest) distance per parent, in one pass over the raw chunk hits
+    best_by_pid: dict[str, float] = {}
+    for r in raw_results:
+        pid = r.get("parent_id") or r["id"]
+        d = r["distance"]
+        prev = best_by_pid.get(pid)
+        if prev is None or d < prev:
+            best_by_pid[pid] = d
+    parent_ids = list(best_by_pid)
     # Fetch all chunks for these parents (metadata has parent_id)
     all_chunks = coll.get(
         where={"parent_id": {"$in": parent_ids}},
@@ -361,25 +528,34 @@ def _expand_chunks_to_parents(
     by_parent_original: dict[str, list[tuple[int, str, dict]]] = {}
     translations_by_parent: dict[str, set[str]] = {}  # parent_id -> set of translation languages
     
-    for i, doc_id in enumerate(all_chunks["ids"]):
-        meta = (all_chunks["metadatas"] or [{}])[i] or {}
-        doc = (all_chunks["documents"] or [""])[i] or ""
+    # Resolve the result columns once, then walk them in lockstep
+    chunk_ids = all_chunks["ids"] or []
+    chunk_metas = all_chunks["metadatas"] or [None] * len(chunk_ids)
+    chunk_docs = all_chunks["documents"] or [None] * len(chunk_ids)
+    for doc_id, meta, doc in zip(chunk_ids, chunk_metas, chunk_docs):
+        meta = meta or {}
         pid = meta.get("parent_id") or doc_id
-        idx = int(meta.get("chunk_index", 0))
-        is_translation = meta.get("is_translation", "false") == "true"
+        entry = (int(meta.get("chunk_index", 0)), doc or "", meta)
         trans_lang = (meta.get("translation_language", "") or "").lower()
         
         # Group by language
         if trans_lang:
-            by_parent_lang.setdefault(pid, {}).setdefault(trans_lang, []).append((idx, doc, meta))
+            langs = by_parent_lang.get(pid)
+            if langs is None:
+                langs = by_parent_lang[pid] = {}
+            chunks = langs.get(trans_lang)
+            if chunks is None:
+                langs[trans_lang] = [entry]
+            else:
+                chunks.append(entry)
         
-        if is_translation:
+        if meta.get("is_translation", "false") == "true":
             # Track translation languages for this parent
             if trans_lang:
                 translations_by_parent.setdefault(pid, set()).add(trans_lang)
         else:
             # Track original chunks
-            by_parent_original.setdefault(pid, []).append((idx, doc, meta))
+            by_parent_original.setdefault(pid, []).append(entry)
     
     # Backwards compat: old docs have no parent_id; fetch by id
     missing = [pid for pid in parent_ids if pid not in by_parent_lang]
@@ -413,8 +589,7 @@ def _expand_chunks_to_parents(
         merged_text = "\n\n".join(c[1] for c in chunks_sorted)
         first_meta = chunks_sorted[0][2]
         title = first_meta.get("title") or None
-        md = first_meta.get("metadata_json")
-        metadata = _parse_metadata_json(md) or {}
+        metadata = _read_metadata(first_meta) or {}
         
         # Add translation info to metadata
         generated_langs = translations_by_parent.get(pid, set())
@@ -432,19 +607,73 @@ def _expand_chunks_to_parents(
         metadata["has_generated_translations"] = len(generated_langs) > 0
         metadata["available_languages"] = sorted(all_languages)
         
-        distances = [r["distance"] for r in raw_results if (r.get("parent_id") or r["id"]) == pid]
-        best_dist = min(distances) if distances else 0.0
         out.append({
             "id": pid,
             "text": merged_text,
             "title": title,
             "metadata": metadata,
-            "distance": best_dist,
+            "distance": best_by_pid[pid],
         })
     out.sort(key=lambda x: x["distance"])
     return out
 
 
+def get_snippets_by_ids(ids: list[str], languages: list[str] | None = None) -> list[dict]:
+    """Fetch original snippets by parent id with a primary-key/metadata lookup (no collection scan).
+
+    Chunks are merged like list_snippets; translations are not returned. If languages
+    is set, snippets whose language is known and not in it are skipped.
+    Returns list of {id, text, title, group, metadata} in the order of ids.
+    """
+    if not ids:
+        return []
+    coll = _get_collection()
+    result = coll.get(
+        where={"parent_id": {"$in": list(ids)}},
+        include=["documents", "metadatas"],
+    )
+    by_parent: dict[str, list[tuple[int, str, dict]]] = {}
+    for i, doc_id in enumerate(result["ids"] or []):
+        meta = (result["metadatas"] or [{}])[i] or {}
+        if meta.get("is_translation", "false") == "true":
+            continue
+        doc = (result["documents"] or [""])[i] or ""
+        pid = meta.get("parent_id") or doc_id
+        by_parent.setdefault(pid, []).append((int(meta.get("chunk_index", 0)), doc, meta))
+
+    # Backwards compat: old docs have no parent_id; fetch by id
+    missing = [sid for sid in ids if sid not in by_parent]
+    if missing:
+        fallback = coll.get(ids=missing, include=["documents", "metadatas"])
+        for i, doc_id in enumerate(fallback["ids"] or []):
+            meta = (fallback["metadatas"] or [{}])[i] or {}
+            if meta.get("is_translation", "false") == "true" or (meta.get("parent_id") or doc_id) != doc_id:
+                continue
+            doc = (fallback["documents"] or [""])[i] or ""
+            by_parent[doc_id] = [(0, doc, meta)]
+
+    lang_filter = {lang.lower() for lang in languages} if languages else None
+    snippets = []
+    for sid in dict.fromkeys(ids):
+        chunks = by_parent.get(sid)
+        if not chunks:
+            continue
+        chunks_sorted = sorted(chunks, key=lambda x: x[0])
+        first = chunks_sorted[0][2]
+        metadata = _read_metadata(first) or {}
+        snippet_lang = (metadata.get("language") or "").lower()
+        if lang_filter and snippet_lang and snippet_lang not in lang_filter:
+            continue
+        snippets.append({
+            "id": sid,
+            "text": "\n\n".join(c[1] for c in chunks_sorted),
+            "title": first.get("title") or None,
+            "group": first.get("group") or "",
+            "metadata": metadata,
+        })
+    return snippets
+
+
 def query_snippets(
     query_embedding: list[float],
     top_k: int = 5,
@@ -499,7 +728,7 @@ def query_snippets(
             "parent_id": meta.get("parent_id") or id_,
             "text": docs[i],
             "title": meta.get("title"),
-            "metadata": _parse_metadata_json(meta.get("metadata_json")),
+            "metadata": _read_metadata(meta),
             "distance": float(distances[i]),
         })
     # Pass target language so we return text in the requested language
@@ -513,11 +742,13 @@ def query_example_questions(
     top_k: int = 5,
     group_names: list[str] | None = None,
     snippet_ids: list[str] | None = None,
+    languages: list[str] | None = None,
 ) -> list[dict]:
     """Search example questions collection for similar questions.
     
     Returns list of {snippet_id, question, distance, title, group}.
     Used for hybrid retrieval - matching user questions against example questions.
+    If languages is set, only questions of snippets in those languages are searched.
     """
     eq_coll = _get_example_questions_collection()
     n = eq_coll.count()
@@ -530,6 +761,8 @@ def query_example_questions(
         conditions.append({"group": {"$in": group_names}})
     if snippet_ids:
         conditions.append({"snippet_id": {"$in": snippet_ids}})
+    if languages:
+        conditions.append({"language": {"$in": [lang.lower() for lang in languages]}})
     
     where = None
     if len(conditions) == 1:
@@ -591,141 +824,191 @@ def list_snippets(
     Returns:
         Tuple of (snippets list, total count)
     """
-    coll = _get_collection()
-    n = coll.count()
-    if n == 0:
-        return [], 0
-    fetch_limit = min(max(n, 10000), 500_000)
-    result = coll.get(
-        include=["documents", "metadatas"],
-        limit=fetch_limit,
+    # kb_version covers writes made in this process; the collection count and a short age
+    # bucket catch writes from other processes (scripts), which don't bump our version.
+    originals, translations, original_languages = _snippet_index_at(
+        semantic_cache.kb_version(), _get_collection().count(), int(time.monotonic() // _SNIPPET_INDEX_MAX_AGE)
     )
-    ids = result["ids"] or []
-    if not ids:
+    if not originals and not translations:
         return [], 0
-    
-    # Normalize language filter
+
+    # Normalize language and group filters
     lang_filter = {lang.lower() for lang in languages} if languages else None
-    
-    # Group by parent_id, tracking originals and translations separately
-    by_parent: dict[str, list[tuple[int, str, dict]]] = {}
-    translations_by_parent: dict[str, dict[str, list[tuple[int, str, dict]]]] = {}  # parent_id -> {lang -> chunks}
-    
-    for i, doc_id in enumerate(ids):
-        meta = (result["metadatas"] or [{}])[i] or {}
-        doc = (result["documents"] or [""])[i] or ""
-        pid = meta.get("parent_id") or doc_id
-        idx = int(meta.get("chunk_index", 0))
-        is_translation = meta.get("is_translation", "false") == "true"
-        trans_lang = meta.get("translation_language", "")
-        
-        if is_translation:
-            # Track translation chunks by language
-            if trans_lang:
-                translations_by_parent.setdefault(pid, {}).setdefault(trans_lang, []).append((idx, doc, meta))
+    if group_names is not None and len(group_names) > 0:
+        want_groups = {g if g else "" for g in group_names}
+    elif group_name is not None:
+        want_groups = {group_name if group_name else ""}
+    else:
+        want_groups = None
+
+    # Filter and page on the metadata index; (parent_id, translation language or None)
+    entries: list[tuple[str, str | None]] = []
+    for pid, first in originals.items():
+        snippet_lang = original_languages[pid]
+        if lang_filter and snippet_lang and snippet_lang not in lang_filter:
             continue
-            
-        by_parent.setdefault(pid, []).append((idx, doc, meta))
-    
+        if want_groups is not None and (first.get("group") or "") not in want_groups:
+            continue
+        entries.append((pid, None))
+    if include_translations:
+        for pid, lang_firsts in translations.items():
+            orig_group = (originals.get(pid) or {}).get("group") or ""
+            if want_groups is not None and orig_group not in want_groups:
+                continue
+            for lang in lang_firsts:
+                if lang_filter and lang.lower() not in lang_filter:
+                    continue
+                entries.append((pid, lang))
+
+    total = len(entries)
+    page = entries[offset : offset + limit]
+    if not page:
+        return [], total
+
+    # Only the page's documents and example questions are fetched
+    coll = _get_collection()
+    texts = _merged_texts(coll, list(dict.fromkeys(pid for pid, _ in page)))
+    eq_by_snippet = _example_questions_by_snippet(
+        [pid if lang is None else f"{pid}_tr_{lang}" for pid, lang in page]
+    )
+
     snippets = []
-    eq_coll = _get_example_questions_collection()
-    
-    # Process original snippets
-    for pid, chunks in by_parent.items():
-        chunks_sorted = sorted(chunks, key=lambda x: x[0])
-        merged = "\n\n".join(c[1] for c in chunks_sorted)
-        first = chunks_sorted[0][2]
-        title = first.get("title") or None
-        group = first.get("group") or ""  # "" = ungrouped
-        metadata = _parse_metadata_json(first.get("metadata_json")) or {}
-        
-        # Add translation info to metadata
-        generated_langs = set(translations_by_parent.get(pid, {}).keys())
-        linked_snippets = metadata.get("linked_snippets", [])
-        original_lang = metadata.get("language", "")
-        
-        # Combine available languages from own language, generated translations, and linked siblings
-        all_languages = set()
-        if original_lang:
-            all_languages.add(original_lang)
-        all_languages.update(generated_langs)
-        all_languages.update(_extract_languages_from_linked_snippets(linked_snippets))
-        
-        metadata["has_generated_translations"] = len(generated_langs) > 0
-        metadata["available_languages"] = sorted(all_languages)
-        metadata["is_generated_translation"] = False
-        
-        # Fetch example questions from collection if not in metadata
-        if "example_questions" not in metadata or not metadata["example_questions"]:
-            eq_result = eq_coll.get(where={"snippet_id": pid}, include=["documents"])
-            if eq_result["ids"]:
-                metadata["example_questions"] = eq_result["documents"]
-        
-        # Apply language filter for original snippets
-        snippet_lang = (original_lang or "").lower()
-        if lang_filter and snippet_lang and snippet_lang not in lang_filter:
+    for pid, lang in page:
+        if lang is None:
+            first = originals[pid]
+            metadata = _read_metadata(first) or {}
+
+            # Add translation info to metadata
+            generated_langs = set(translations.get(pid, {}))
+            linked_snippets = metadata.get("linked_snippets", [])
+            original_lang = metadata.get("language", "")
+
+            # Combine available languages from own language, generated translations, and linked siblings
+            all_languages = set()
+            if original_lang:
+                all_languages.add(original_lang)
+            all_languages.update(generated_langs)
+            all_languages.update(_extract_languages_from_linked_snippets(linked_snippets))
+
+            metadata["has_generated_translations"] = len(generated_langs) > 0
+            metadata["available_languages"] = sorted(all_languages)
+            metadata["is_generated_translation"] = False
+
+            # Fetch example questions from collection if not in metadata
+            if not metadata.get("example_questions") and eq_by_snippet.get(pid):
+                metadata["example_questions"] = eq_by_snippet[pid]
+
+            snippets.append({
+                "id": pid,
+                "text": texts.get((pid, None), ""),
+                "title": first.get("title") or None,
+                "group": first.get("group") or "",  # "" = ungrouped
+                "metadata": metadata,
+            })
             continue
-        
+
+        # Generated translation as a separate entry
+        orig_first = originals.get(pid) or {}
+        orig_title = orig_first.get("title") or ""
+        metadata = _read_metadata(translations[pid][lang]) or {}
+        metadata["is_generated_translation"] = True
+        metadata["translation_source"] = "generated"
+        metadata["has_generated_translations"] = False
+        metadata["available_languages"] = [lang]
+
+        translation_id = f"{pid}_tr_{lang}"
+        if eq_by_snippet.get(translation_id):
+            metadata["example_questions"] = eq_by_snippet[translation_id]
+
         snippets.append({
-            "id": pid,
-            "text": merged,
-            "title": title,
-            "group": group,
+            "id": translation_id,
+            "text": texts.get((pid, lang), ""),
+            "title": f"{orig_title} [{lang.upper()}]" if orig_title else f"[{lang.upper()}]",
+            "group": orig_first.get("group") or "",
             "metadata": metadata,
         })
-    
-    # Include generated translations as separate entries if requested
-    if include_translations:
-        for pid, lang_chunks in translations_by_parent.items():
-            # Get original snippet info for reference
-            orig_chunks = by_parent.get(pid, [])
-            orig_first = orig_chunks[0][2] if orig_chunks else {}
-            orig_title = orig_first.get("title") or ""
-            orig_group = orig_first.get("group") or ""
-            
-            for lang, chunks in lang_chunks.items():
-                # Apply language filter
-                if lang_filter and lang.lower() not in lang_filter:
-                    continue
-                
-                chunks_sorted = sorted(chunks, key=lambda x: x[0])
-                merged = "\n\n".join(c[1] for c in chunks_sorted)
-                first = chunks_sorted[0][2]
-                metadata = _parse_metadata_json(first.get("metadata_json")) or {}
-                
-                # Mark as generated translation
-                metadata["is_generated_translation"] = True
-                metadata["translation_source"] = "generated"
-                metadata["has_generated_translations"] = False
-                metadata["available_languages"] = [lang]
-                
-                # Fetch example questions for this translation from the collection
-                translation_id = f"{pid}_tr_{lang}"
-                eq_result = eq_coll.get(where={"snippet_id": translation_id}, include=["documents"])
-                if eq_result["ids"]:
-                    metadata["example_questions"] = eq_result["documents"]
-                
-                snippets.append({
-                    "id": translation_id,
-                    "text": merged,
-                    "title": f"{orig_title} [{lang.upper()}]" if orig_title else f"[{lang.upper()}]",
-                    "group": orig_group,
-                    "metadata": metadata,
-                })
-    
-    # Filter by group(s)
-    if group_names is not None and len(group_names) > 0:
-        want_set = {g if g else "" for g in group_names}
-        snippets = [s for s in snippets if (s.get("group") or "") in want_set]
-    elif group_name is not None:
-        want = group_name if group_name else ""
-        snippets = [s for s in snippets if (s.get("group") or "") == want]
-    
-    total = len(snippets)
-    snippets = snippets[offset : offset + limit]
     return snippets, total
 
 
+# Seconds an out-of-band edit (same chunk count) can stay invisible to list_snippets
+_SNIPPET_INDEX_MAX_AGE = 30
+
+
+@lru_cache(maxsize=1)
+def _snippet_index_at(
+    kb_version: int, count: int, age_bucket: int,
+) -> tuple[dict[str, dict], dict[str, dict[str, dict]], dict[str, str]]:
+    """One pass over chunk metadata (no documents) for list_snippets.
+
+    Returns (originals, translations, original_languages): the first chunk's metadata per
+    parent, the first chunk's metadata per parent and translation language, and each
+    parent's lowercased language. Insertion order follows the collection.
+    """
+    if count == 0:
+        return {}, {}, {}
+    fetch_limit = min(max(count, 10000), 500_000)
+    result = _get_collection().get(include=["metadatas"], limit=fetch_limit)
+
+    originals: dict[str, tuple[int, dict]] = {}
+    translations: dict[str, dict[str, tuple[int, dict]]] = {}
+    for doc_id, meta in zip(result["ids"] or [], result["metadatas"] or []):
+        meta = meta or {}
+        pid = meta.get("parent_id") or doc_id
+        idx = int(meta.get("chunk_index", 0))
+        if meta.get("is_translation", "false") == "true":
+            trans_lang = meta.get("translation_language", "")
+            if trans_lang:
+                by_lang = translations.setdefault(pid, {})
+                cur = by_lang.get(trans_lang)
+                if cur is None or idx < cur[0]:
+                    by_lang[trans_lang] = (idx, meta)
+            continue
+        cur = originals.get(pid)
+        if cur is None or idx < cur[0]:
+            originals[pid] = (idx, meta)
+
+    first_by_pid = {pid: meta for pid, (_, meta) in originals.items()}
+    return (
+        first_by_pid,
+        {pid: {lang: meta for lang, (_, meta) in by_lang.items()} for pid, by_lang in translations.items()},
+        {pid: ((_read_metadata(meta) or {}).get("language") or "").lower() for pid, meta in first_by_pid.items()},
+    )
+
+
+def _merged_texts(coll, parent_ids: list[str]) -> dict[tuple[str, str | None], str]:
+    """Merged chunk text per (parent_id, translation language or None for the original)."""
+    result = coll.get(where={"parent_id": {"$in": parent_ids}}, include=["documents", "metadatas"])
+    chunks: dict[tuple[str, str | None], list[tuple[int, str]]] = {}
+    for doc_id, doc, meta in zip(result["ids"] or [], result["documents"] or [], result["metadatas"] or []):
+        meta = meta or {}
+        pid = meta.get("parent_id") or doc_id
+        lang = meta.get("translation_language", "") if meta.get("is_translation", "false") == "true" else None
+        chunks.setdefault((pid, lang), []).append((int(meta.get("chunk_index", 0)), doc or ""))
+
+    # Backwards compat: old docs have no parent_id; fetch by id
+    missing = [pid for pid in parent_ids if (pid, None) not in chunks]
+    if missing:
+        fallback = coll.get(ids=missing, include=["documents"])
+        for doc_id, doc in zip(fallback["ids"] or [], fallback["documents"] or []):
+            chunks[(doc_id, None)] = [(0, doc or "")]
+    return {key: "\n\n".join(d for _, d in sorted(c, key=lambda x: x[0])) for key, c in chunks.items()}
+
+
+def _example_questions_by_snippet(snippet_ids: list[str]) -> dict[str, list[str]]:
+    """Indexed example questions for several snippets with one query."""
+    if not snippet_ids:
+        return {}
+    result = _get_example_questions_collection().get(
+        where={"snippet_id": {"$in": snippet_ids}}, include=["documents", "metadatas"]
+    )
+    out: dict[str, list[str]] = {}
+    for doc, meta in zip(result["documents"] or [], result["metadatas"] or []):
+        sid = (meta or {}).get("snippet_id")
+        if sid:
+            out.setdefault(sid, []).append(doc)
+    return out
+
+
 _RUNTIME_METADATA_KEYS = frozenset({
     "has_generated_translations",
     "available_languages",
@@ -803,7 +1086,7 @@ def list_snippets_grouped(
         first = chunks_sorted[0][2]
         title = first.get("title") or ""
         grp = first.get("group") or ""
-        metadata = _parse_metadata_json(first.get("metadata_json")) or {}
+        metadata = _read_metadata(first) or {}
 
         original_lang = (metadata.get("language") or "").lower()
         original_text = "\n\n".join(c[1] for c in chunks_sorted)
@@ -832,7 +1115,7 @@ def list_snippets_grouped(
         for lang, tr_chunks in translations_by_parent.get(pid, {}).items():
             tr_sorted = sorted(tr_chunks, key=lambda x: x[0])
             tr_text = "\n\n".join(c[1] for c in tr_sorted)
-            tr_meta = _parse_metadata_json(tr_sorted[0][2].get("metadata_json")) or {}
+            tr_meta = _read_metadata(tr_sorted[0][2]) or {}
             tr_eq = tr_meta.get("example_questions", [])
             if not tr_eq:
                 translation_id = f"{pid}_tr_{lang}"
@@ -948,6 +1231,14 @@ def list_snippets_grouped(
 
 def get_snippet_metadata(snippet_id: str) -> dict | None:
     """Return parsed metadata for a snippet (from first chunk), or None if not found."""
+    meta = _snippet_metadata_at(snippet_id, semantic_cache.kb_version())
+    return dict(meta) if meta is not None else None  # copy: callers may modify it
+
+
+# Read caches below are keyed by the knowledge base version, which every write bumps,
+# so stale entries are never returned and simply age out of the LRU.
+@lru_cache(maxsize=4096)
+def _snippet_metadata_at(snippet_id: str, kb_version: int) -> dict | None:
     coll = _get_collection()
     result = coll.get(
         where={"parent_id": snippet_id},
@@ -959,15 +1250,20 @@ def get_snippet_metadata(snippet_id: str) -> dict | None:
     if not result["ids"]:
         return None
     meta = (result["metadatas"] or [{}])[0] or {}
-    return _parse_metadata_json(meta.get("metadata_json"))
+    return _read_metadata(meta)
 
 
 def list_groups() -> list[str]:
     """Return distinct group names (including empty string for ungrouped)."""
+    return list(_groups_at(semantic_cache.kb_version()))
+
+
+@lru_cache(maxsize=1)
+def _groups_at(kb_version: int) -> tuple[str, ...]:
     coll = _get_collection()
     n = coll.count()
     if n == 0:
-        return []
+        return ()
     fetch_limit = min(max(n, 10000), 500_000)
     result = coll.get(include=["metadatas"], limit=fetch_limit)
     metas = result.get("metadatas") or []
@@ -976,7 +1272,7 @@ def list_groups() -> list[str]:
         if m and isinstance(m, dict):
             g = m.get("group")
             groups.add(g if g else "")
-    return sorted(groups, key=lambda x: (x == "", x.lower()))
+    return tuple(sorted(groups, key=lambda x: (x == "", x.lower())))
 
 
 def update_snippet(
@@ -1000,6 +1296,7 @@ def update_snippet(
         existing = coll.get(ids=[snippet_id], include=[])
     if existing["ids"]:
         coll.delete(ids=existing["ids"])
+        semantic_cache.invalidate()
     
     # Delete old example questions
     _delete_example_questions(snippet_id)
@@ -1087,7 +1384,7 @@ def update_snippet(
             }
             
             enriched_metadata = {**user_metadata, "language": variant_lang}
-            meta["metadata_json"] = json.dumps(enriched_metadata)
+            meta.update(_metadata_fields(enriched_metadata))
             
             ids.append(doc_id)
             docs.append(chunk)
@@ -1096,13 +1393,14 @@ def update_snippet(
     if not ids:
         return True
         
-    embeddings = embed(docs).tolist()
+    embeddings = _as_chroma_embeddings(embed_documents(docs))
     coll.upsert(ids=ids, embeddings=embeddings, documents=docs, metadatas=metadatas_list)
+    semantic_cache.invalidate()
     
     # Index example questions for hybrid search
     example_questions = user_metadata.get("example_questions", [])
     if example_questions:
-        _index_example_questions(snippet_id, example_questions, title or "", group or "")
+        _index_example_questions(snippet_id, example_questions, title or "", group or "", original_language)
     
     return True
 
@@ -1140,6 +1438,7 @@ def update_snippet_grouped(
 
     if existing["ids"]:
         coll.delete(ids=existing["ids"])
+        semantic_cache.invalidate()
     _delete_example_questions(snippet_id)
 
     settings = get_settings()
@@ -1186,14 +1485,14 @@ def update_snippet_grouped(
                 "translation_language": first_lang,
                 "is_translation": "false",
             }
-            meta["metadata_json"] = json.dumps({**user_metadata, "language": first_lang})
+            meta.update(_metadata_fields({**user_metadata, "language": first_lang}))
             all_ids.append(doc_id)
             all_docs.append(chunk)
             all_metas.append(meta)
 
     if first_tr.get("example_questions"):
         _index_example_questions(
-            snippet_id, first_tr["example_questions"], title or "", group or ""
+            snippet_id, first_tr["example_questions"], title or "", group or "", first_lang
         )
 
     remaining: dict[str, dict] = {
@@ -1225,19 +1524,20 @@ def update_snippet_grouped(
             enriched["translation_source"] = (
                 "generated" if tr.get("is_generated_translation") else "original"
             )
-            meta["metadata_json"] = json.dumps(enriched)
+            meta.update(_metadata_fields(enriched))
             all_ids.append(doc_id)
             all_docs.append(chunk)
             all_metas.append(meta)
 
         if tr.get("example_questions"):
             _index_example_questions(
-                f"{snippet_id}_tr_{lang}", tr["example_questions"], title or "", group or ""
+                f"{snippet_id}_tr_{lang}", tr["example_questions"], title or "", group or "", lang
             )
 
     if all_ids:
-        embeddings = embed(all_docs).tolist()
+        embeddings = _as_chroma_embeddings(embed_documents(all_docs))
         coll.upsert(ids=all_ids, embeddings=embeddings, documents=all_docs, metadatas=all_metas)
+        semantic_cache.invalidate()
 
     return True
 
@@ -1248,6 +1548,7 @@ def delete_snippet(snippet_id: str) -> bool:
     result = coll.get(where={"parent_id": snippet_id}, include=[])
     if result["ids"]:
         coll.delete(ids=result["ids"])
+        semantic_cache.invalidate()
     
     # Delete associated example questions
     _delete_example_questions(snippet_id)
@@ -1272,6 +1573,7 @@ def delete_snippets_by_group(group_name: str) -> int:
     )
     ids_to_delete: list[str] = []
     parent_ids: set[str] = set()
+    translation_ids: set[str] = set()
 
     target = group_name if group_name else ""
     for i, doc_id in enumerate(result["ids"]):
@@ -1280,19 +1582,22 @@ def delete_snippets_by_group(group_name: str) -> int:
             ids_to_delete.append(doc_id)
             pid = meta.get("parent_id") or doc_id
             parent_ids.add(pid)
+            if meta.get("is_translation") == "true" and meta.get("translation_language"):
+                translation_ids.add(f"{pid}_tr_{meta['translation_language']}")
 
     if ids_to_delete:
         for batch_start in range(0, len(ids_to_delete), 5000):
             coll.delete(ids=ids_to_delete[batch_start : batch_start + 5000])
+            semantic_cache.invalidate()
 
-    eq_coll = _get_example_questions_collection()
+    # Example questions of the originals and their translations (snippet_id "<pid>_tr_<lang>")
+    eq_snippet_ids = set(translation_ids)
     for pid in parent_ids:
-        _delete_example_questions(pid)
-        for lang in ("en", "de", "fr", "it", "es", "pt", "nl", "pl", "ru", "zh", "ja", "ko"):
-            tr_id = f"{pid}_tr_{lang}"
-            eq_result = eq_coll.get(where={"snippet_id": tr_id}, include=[])
-            if eq_result["ids"]:
-                eq_coll.delete(ids=eq_result["ids"])
+        eq_snippet_ids.add(pid)
+        eq_snippet_ids.update(
+            f"{pid}_tr_{lang}" for lang in ("en", "de", "fr", "it", "es", "pt", "nl", "pl", "ru", "zh", "ja", "ko")
+        )
+    _delete_example_questions_bulk(sorted(eq_snippet_ids))
 
     logger.info("Deleted %d chunks (%d logical snippets) from group '%s'",
                 len(ids_to_delete), len(parent_ids), group_name)
@@ -1319,12 +1624,14 @@ def update_example_questions(snippet_id: str, example_questions: list[str]) -> b
     
     title = ""
     group = ""
+    language = ""
     
     if eq_result["ids"]:
         # Get title/group from existing example questions metadata
         meta = (eq_result["metadatas"] or [{}])[0] or {}
         title = meta.get("title", "")
         group = meta.get("group", "")
+        language = meta.get("language", "")
     else:
         # Try to get from snippets collection
         coll = _get_collection()
@@ -1342,6 +1649,8 @@ def update_example_questions(snippet_id: str, example_questions: list[str]) -> b
             meta = (result["metadatas"] or [{}])[0] or {}
             title = meta.get("title", "")
             group = meta.get("group", "")
+    if not language:
+        language = _example_question_language(snippet_id)
     
     # Delete old example questions
     _delete_example_questions(snippet_id)
@@ -1350,40 +1659,17 @@ def update_example_questions(snippet_id: str, example_questions: list[str]) -> b
     if example_questions:
         questions = [q.strip() for q in example_questions if q and q.strip()]
         if questions:
-            _index_example_questions(snippet_id, questions, title, group)
+            _index_example_questions(snippet_id, questions, title, group, language)
             logger.info("Updated %d example questions for snippet %s", len(questions), snippet_id)
     
     return True
 
 
-def get_snippets_by_titles(titles: list[str]) -> list[dict]:
-    """Fetch snippets by their titles. Used for fetching linked translations.
-    
-    Returns list of {id, text, title, group, metadata} for each found snippet.
-    """
-    if not titles:
-        return []
-    
-    coll = _get_collection()
-    n = coll.count()
-    if n == 0:
-        return []
-    
-    # Fetch all snippets and filter by title (Chroma doesn't support $in on title)
-    fetch_limit = min(max(n, 10000), 500_000)
-    result = coll.get(
-        include=["documents", "metadatas"],
-        limit=fetch_limit,
-    )
+def _collect_title_matches(
+    result: dict, title_set: set[str], by_parent: dict[str, list[tuple[int, str, dict]]]
+) -> None:
+    """Add original (non-translation) chunks from a get() result whose lowercased title is in title_set."""
     ids = result["ids"] or []
-    if not ids:
-        return []
-    
-    # Normalize titles for matching (lowercase)
-    title_set = {t.lower() for t in titles}
-    
-    # Group by parent_id, only including original chunks (not translations)
-    by_parent: dict[str, list[tuple[int, str, dict]]] = {}
     for i, doc_id in enumerate(ids):
         meta = (result["metadatas"] or [{}])[i] or {}
         doc = (result["documents"] or [""])[i] or ""
@@ -1391,14 +1677,50 @@ def get_snippets_by_titles(titles: list[str]) -> list[dict]:
         idx = int(meta.get("chunk_index", 0))
         is_translation = meta.get("is_translation", "false") == "true"
         title = (meta.get("title") or "").lower()
-        
+
         # Skip translation chunks and non-matching titles
         if is_translation:
             continue
         if title not in title_set:
             continue
-            
+
         by_parent.setdefault(pid, []).append((idx, doc, meta))
+
+
+def get_snippets_by_titles(titles: list[str]) -> list[dict]:
+    """Fetch snippets by their titles. Used for fetching linked translations.
+    
+    Titles match case-insensitively. Exact matches come from one filtered get();
+    only titles that differ in case fall back to scanning the collection.
+
+    Returns list of {id, text, title, group, metadata} for each found snippet.
+    """
+    if not titles:
+        return []
+    
+    coll = _get_collection()
+    # Normalize titles for matching (lowercase)
+    title_set = {t.lower() for t in titles}
+    by_parent: dict[str, list[tuple[int, str, dict]]] = {}
+
+    exact = coll.get(
+        where={"title": {"$in": list(dict.fromkeys(titles))}},
+        include=["documents", "metadatas"],
+    )
+    _collect_title_matches(exact, title_set, by_parent)
+    found = {(chunks[0][2].get("title") or "").lower() for chunks in by_parent.values()}
+    missing = title_set - found
+
+    if missing:
+        n = coll.count()
+        if n > 0:
+            # Case-insensitive leftovers: fetch all snippets and filter by title
+            fetch_limit = min(max(n, 10000), 500_000)
+            result = coll.get(
+                include=["documents", "metadatas"],
+                limit=fetch_limit,
+            )
+            _collect_title_matches(result, missing, by_parent)
     
     snippets = []
     for pid, chunks in by_parent.items():
@@ -1407,7 +1729,7 @@ def get_snippets_by_titles(titles: list[str]) -> list[dict]:
         first = chunks_sorted[0][2]
         title = first.get("title") or None
         group = first.get("group") or ""
-        metadata = _parse_metadata_json(first.get("metadata_json"))
+        metadata = _read_metadata(first)
         snippets.append({
             "id": pid,
             "text": merged,
@@ -1467,7 +1789,7 @@ def get_linked_snippets(snippet_id: str) -> list[dict]:
             chunks_sorted = sorted(by_type["original"], key=lambda x: x[0])
             merged = "\n\n".join(c[1] for c in chunks_sorted)
             first_meta = chunks_sorted[0][2]
-            orig_md = _parse_metadata_json(first_meta.get("metadata_json")) or {}
+            orig_md = _read_metadata(first_meta) or {}
             original_language = orig_md.get("language", "en")
             seen_languages.add(original_language)
             results.append({
@@ -1493,7 +1815,7 @@ def get_linked_snippets(snippet_id: str) -> list[dict]:
                 chunks_sorted = sorted(chunks, key=lambda x: x[0])
                 merged = "\n\n".join(c[1] for c in chunks_sorted)
                 first_meta = chunks_sorted[0][2]
-                tr_md = _parse_metadata_json(first_meta.get("metadata_json")) or {}
+                tr_md = _read_metadata(first_meta) or {}
                 results.append({
                     "id": f"{snippet_id}_tr_{lang}",
                     "text": merged,
@@ -1553,7 +1875,7 @@ def get_snippet_translation_info(snippet_id: str) -> dict:
             languages.add(lang)
         
         # Check for linked_snippets in metadata
-        md = _parse_metadata_json(meta.get("metadata_json"))
+        md = _read_metadata(meta)
         if md and md.get("linked_snippets"):
             has_linked = True
     
@@ -2,9 +2,9 @@
 from __future__ import annotations
 
 import logging
-from openai import AzureOpenAI, OpenAI
 
 from .config import Settings, get_settings
+from .generation import _client_azure, _client_ollama, _resolve_provider
 
 logger = logging.getLogger(__name__)
 
@@ -25,35 +25,6 @@ LANGUAGE_NAMES = {
 }
 
 
-def _client_azure(settings: Settings) -> AzureOpenAI | None:
-    if not settings.azure_openai_api_key or not settings.azure_openai_endpoint:
-        return None
-    return AzureOpenAI(
-        api_key=settings.azure_openai_api_key,
-        api_version=settings.azure_openai_api_version,
-        azure_endpoint=settings.azure_openai_endpoint,
-    )
-
-
-def _client_ollama(settings: Settings) -> OpenAI | None:
-    return OpenAI(
-        base_url=settings.ollama_base_url.rstrip("/") + "/v1",
-        api_key="ollama",
-    )
-
-
-def _resolve_provider(settings: Settings) -> str:
-    if settings.llm_provider == "azure":
-        return "azure" if (settings.azure_openai_api_key and settings.azure_openai_endpoint) else "none"
-    if settings.llm_provider == "ollama":
-        return "ollama"
-    if settings.llm_provider == "none":
-        return "none"
-    if settings.azure_openai_api_key and settings.azure_openai_endpoint:
-        return "azure"
-    return "ollama"
-
-
 def detect_language(text: str, settings: Settings | None = None) -> str:
     """Detect the language of a text. Returns ISO 639-1 code (e.g., 'en', 'de', 'fr').
     Uses langdetect library first, falls back to LLM if needed."""
@@ -2,6 +2,8 @@
 from __future__ import annotations
 
 from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO
 
 from docx import Document as DocxDocument
 from pypdf import PdfReader
@@ -9,14 +11,28 @@ from pypdf import PdfReader
 
 def extract_text_from_bytes(content: bytes, filename: str) -> str:
     """Extract plain text from file content. Supports .txt, .docx, and .pdf."""
+    return _extract_text(BytesIO(content), filename)
+
+
+def extract_text_from_path(path: str | Path, filename: str) -> str:
+    """Like extract_text_from_bytes, but reads the file from disk.
+
+    Takes a path rather than bytes so it can run in a worker process without the
+    file content being pickled across.
+    """
+    with open(path, "rb") as fh:
+        return _extract_text(fh, filename)
+
+
+def _extract_text(fp: BinaryIO, filename: str) -> str:
     name = (filename or "").lower()
     if name.endswith(".txt"):
-        return content.decode("utf-8", errors="replace").strip()
+        return fp.read().decode("utf-8", errors="replace").strip()
     if name.endswith(".docx"):
-        doc = DocxDocument(BytesIO(content))
+        doc = DocxDocument(fp)
         return "\n".join(p.text for p in doc.paragraphs).strip()
     if name.endswith(".pdf"):
-        reader = PdfReader(BytesIO(content))
+        reader = PdfReader(fp)
         parts = []
         for page in reader.pages:
             t = page.extract_text()
@@ -1,8 +1,11 @@
 """SQLite user store: init DB, CRUD, password hash/verify."""
 from __future__ import annotations
 
+import queue
 import sqlite3
 import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
 import bcrypt
@@ -19,16 +22,54 @@ def _get_db_path() -> Path:
     return p
 
 
+# Long-lived connections reused across requests (keeps SQLite's page cache warm and
+# skips connect/PRAGMA setup per query). LIFO so the most recently used one is handed out.
+_POOL_SIZE = 8
+_pool: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue(maxsize=_POOL_SIZE)
+
+
 def _get_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(str(_get_db_path()))
+    conn = sqlite3.connect(str(_get_db_path()), check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-65536")
     return conn
 
 
+@contextmanager
+def acquire() -> Iterator[sqlite3.Connection]:
+    """Borrow a pooled connection; it is returned to the pool (or closed if full) afterwards."""
+    try:
+        conn = _pool.get_nowait()
+    except queue.Empty:
+        conn = _get_connection()
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        try:
+            _pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+def reset_pool() -> None:
+    """Close all pooled connections. Call before replacing the database file (restore)."""
+    while True:
+        try:
+            _pool.get_nowait().close()
+        except queue.Empty:
+            return
+
+
 def init_db() -> None:
     """Create users table if it does not exist; add status column if missing."""
-    conn = _get_connection()
-    try:
+    with acquire() as conn:
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS users (
@@ -51,8 +92,6 @@ def init_db() -> None:
             conn.execute("ALTER TABLE users ADD COLUMN status TEXT DEFAULT 'active'")
             conn.execute("UPDATE users SET status = 'active' WHERE status IS NULL")
         conn.commit()
-    finally:
-        conn.close()
 
 
 def hash_password(password: str) -> str:
@@ -73,8 +112,7 @@ def verify_password(plain: str, hashed: str) -> bool:
 
 
 def get_user_by_id(user_id: str) -> dict | None:
-    conn = _get_connection()
-    try:
+    with acquire() as conn:
         row = conn.execute(
             "SELECT id, email, password_hash, role, status, created_at FROM users WHERE id = ?",
             (user_id,),
@@ -89,13 +127,10 @@ def get_user_by_id(user_id: str) -> dict | None:
             "status": row["status"] if "status" in row.keys() else "active",
             "created_at": row["created_at"],
         }
-    finally:
-        conn.close()
 
 
 def get_user_by_email(email: str) -> dict | None:
-    conn = _get_connection()
-    try:
+    with acquire() as conn:
         row = conn.execute(
             "SELECT id, email, password_hash, role, status, created_at FROM users WHERE email = ?",
             (email.strip().lower(),),
@@ -110,8 +145,6 @@ def get_user_by_email(email: str) -> dict | None:
             "status": row["status"] if "status" in row.keys() else "active",
             "created_at": row["created_at"],
         }
-    finally:
-        conn.close()
 
 
 def create_user(
@@ -123,15 +156,12 @@ def create_user(
     email = email.strip().lower()
     user_id = str(uuid.uuid4())
     password_hash = hash_password(password)
-    conn = _get_connection()
-    try:
+    with acquire() as conn:
         conn.execute(
             "INSERT INTO users (id, email, password_hash, role, status, created_at) VALUES (?, ?, ?, ?, ?, datetime('now'))",
             (user_id, email, password_hash, role, status),
         )
         conn.commit()
-    finally:
-        conn.close()
     return {
         "id": user_id,
         "email": email,
@@ -142,8 +172,7 @@ def create_user(
 
 
 def list_users() -> list[dict]:
-    conn = _get_connection()
-    try:
+    with acquire() as conn:
         rows = conn.execute(
             "SELECT id, email, role, status, created_at FROM users ORDER BY created_at"
         ).fetchall()
@@ -157,46 +186,32 @@ def list_users() -> list[dict]:
             }
             for row in rows
         ]
-    finally:
-        conn.close()
 
 
 def set_user_status(user_id: str, status: str) -> bool:
-    conn = _get_connection()
-    try:
+    with acquire() as conn:
         cur = conn.execute("UPDATE users SET status = ? WHERE id = ?", (status, user_id))
         conn.commit()
         return cur.rowcount > 0
-    finally:
-        conn.close()
 
 
 def set_user_role(user_id: str, role: str) -> bool:
-    conn = _get_connection()
-    try:
+    with acquire() as conn:
         cur = conn.execute("UPDATE users SET role = ? WHERE id = ?", (role, user_id))
         conn.commit()
         return cur.rowcount > 0
-    finally:
-        conn.close()
 
 
 def delete_user(user_id: str) -> bool:
-    conn = _get_connection()
-    try:
+    with acquire() as conn:
         cur = conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
         conn.commit()
         return cur.rowcount > 0
-    finally:
-        conn.close()
 
 
 def count_admins() -> int:
-    conn = _get_connection()
-    try:
+    with acquire() as conn:
         row = conn.execute(
             "SELECT COUNT(*) AS n FROM users WHERE role = 'admin'"
         ).fetchone()
         return row["n"] if row else 0
-    finally:
-        conn.close()
@@ -25,6 +25,7 @@ The script will:
 3. Optionally (--generate-missing): Generate example questions for snippets without them using LLM
 """
 import argparse
+import asyncio
 import sys
 from pathlib import Path
 
@@ -32,28 +33,53 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 
-def index_via_direct_access(dry_run: bool = False, generate_missing: bool = False) -> int:
+def _has_questions(snippet: dict) -> bool:
+    example_questions = (snippet.get("metadata") or {}).get("example_questions", [])
+    return any(q and q.strip() for q in example_questions or [])
+
+
+def _generate_missing_questions(snippets: list[dict], max_concurrency: int) -> dict[str, str]:
+    """Generate example questions for all snippets without any, concurrently.
+
+    Returns {snippet_id: question}; failed generations map to "".
+    """
+    from app.generation import generate_example_questions_batch
+
+    pending = [s for s in snippets if not _has_questions(s) and s.get("text")]
+    if not pending:
+        return {}
+    print(f"Generating example questions for {len(pending)} snippets (concurrency {max_concurrency})...")
+    questions = asyncio.run(generate_example_questions_batch(
+        [(s["text"], s.get("title") or "") for s in pending],
+        max_concurrency=max_concurrency,
+    ))
+    return {s["id"]: q for s, q in zip(pending, questions)}
+
+
+def index_via_direct_access(dry_run: bool = False, generate_missing: bool = False, max_concurrency: int = 10) -> int:
     """Index example questions using direct database access.
     
     Args:
         dry_run: If True, show what would be done without making changes
         generate_missing: If True, generate example questions for snippets that don't have any
+        max_concurrency: Max parallel LLM calls when generating missing questions
     """
     from app.store import (
         list_snippets,
         _index_example_questions,
         _delete_example_questions,
+        _example_question_language,
         _get_example_questions_collection,
         update_snippet,
     )
     
-    # Import generation function if needed
-    if generate_missing:
-        from app.generation import generate_example_question
-    
     print("Fetching all snippets (including translations)...")
     snippets, total = list_snippets(limit=100000, include_translations=True)
     print(f"Found {total} snippets (including translations)")
+
+    generated_by_id: dict[str, str] = {}
+    if generate_missing and not dry_run:
+        generated_by_id = _generate_missing_questions(snippets, max_concurrency)
     
     # Count existing example questions
     eq_coll = _get_example_questions_collection()
@@ -86,7 +112,7 @@ def index_via_direct_access(dry_run: bool = False, generate_missing: bool = Fals
                     print(f"    {j+1}. {q[:60]}{'...' if len(q) > 60 else ''}")
             else:
                 _delete_example_questions(snippet_id)
-                _index_example_questions(snippet_id, questions, title, group)
+                _index_example_questions(snippet_id, questions, title, group, _example_question_language(snippet_id))
                 print(f"  Indexed {len(questions)} existing questions for '{title}' ({snippet_id})")
             indexed_count += 1
             
@@ -98,11 +124,11 @@ def index_via_direct_access(dry_run: bool = False, generate_missing: bool = Fals
             if dry_run:
                 print(f"  [DRY RUN] Would generate example question for '{title}' ({snippet_id})")
             else:
-                print(f"  Generating question for '{title}' ({snippet_id})...", end=" ", flush=True)
-                generated_q = generate_example_question(text, title)
+                print(f"  Question for '{title}' ({snippet_id})...", end=" ", flush=True)
+                generated_q = generated_by_id.get(snippet_id, "")
                 if generated_q:
                     _delete_example_questions(snippet_id)
-                    _index_example_questions(snippet_id, [generated_q], title, group)
+                    _index_example_questions(snippet_id, [generated_q], title, group, _example_question_language(snippet_id))
                     
                     # Save to snippet metadata (only for original snippets, not auto-translations)
                     if not is_auto_translation:
@@ -138,7 +164,7 @@ def index_via_direct_access(dry_run: bool = False, generate_missing: bool = Fals
     return indexed_count + generated_count
 
 
-def index_via_api(api_url: str, email: str, password: str, dry_run: bool = False, generate_missing: bool = False) -> int:
+def index_via_api(api_url: str, email: str, password: str, dry_run: bool = False, generate_missing: bool = False, max_concurrency: int = 10) -> int:
     """Index example questions via API by triggering snippet updates.
     
     Note: When generate_missing=True, this uses direct access for generation
@@ -161,10 +187,6 @@ def index_via_api(api_url: str, email: str, password: str, dry_run: bool = False
     
     headers = {"Authorization": f"Bearer {token}"}
     
-    # Import generation function if needed
-    if generate_missing:
-        from app.generation import generate_example_question
-    
     # Fetch all snippets
     print("Fetching all snippets...")
     snippets_url = f"{api_url}/api/snippets?limit=10000"
@@ -184,6 +206,10 @@ def index_via_api(api_url: str, email: str, password: str, dry_run: bool = False
     
     if generate_missing:
         print("\nWill generate example questions for snippets without them (reverse HyDE)...")
+
+    generated_by_id: dict[str, str] = {}
+    if generate_missing and not dry_run:
+        generated_by_id = _generate_missing_questions(snippets, max_concurrency)
     
     indexed_count = 0
     generated_count = 0
@@ -225,8 +251,8 @@ def index_via_api(api_url: str, email: str, password: str, dry_run: bool = False
             if dry_run:
                 print(f"  [DRY RUN] Would generate and update '{title}' ({snippet_id})")
             else:
-                print(f"  Generating question for '{title}' ({snippet_id})...", end=" ", flush=True)
-                generated_q = generate_example_question(text, title)
+                print(f"  Question for '{title}' ({snippet_id})...", end=" ", flush=True)
+                generated_q = generated_by_id.get(snippet_id, "")
                 if generated_q:
                     # Update snippet with generated question
                     new_metadata = {**metadata, "example_questions": [generated_q]}
@@ -290,15 +316,30 @@ def main():
         action="store_true",
         help="Generate example questions for snippets that don't have any (reverse HyDE)",
     )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=10,
+        help="Max parallel LLM calls when generating missing questions (default: 10)",
+    )
     
     args = parser.parse_args()
     
     if args.direct:
         print("Using direct database access...")
-        count = index_via_direct_access(dry_run=args.dry_run, generate_missing=args.generate_missing)
+        count = index_via_direct_access(
+            dry_run=args.dry_run,
+            generate_missing=args.generate_missing,
+            max_concurrency=args.max_concurrency,
+        )
     elif args.email and args.password:
         print("Using API access...")
-        count = index_via_api(args.api_url, args.email, args.password, dry_run=args.dry_run, generate_missing=args.generate_missing)
+        count = index_via_api(
+            args.api_url, args.email, args.password,
+            dry_run=args.dry_run,
+            generate_missing=args.generate_missing,
+            max_concurrency=args.max_concurrency,
+        )
     else:
         print("Error: Either --direct or --email/--password must be provided")
         parser.print_help()
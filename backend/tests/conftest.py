@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Make the backend's "app" package importable when pytest runs from backend/
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import semantic_cache  # noqa: E402
+
+
+@pytest.fixture
+def cache_settings(monkeypatch):
+    """Semantic cache settings (enabled, threshold 0.9) with an empty cache."""
+    settings = SimpleNamespace(
+        semantic_cache_enabled=True,
+        semantic_cache_threshold=0.9,
+        semantic_cache_ttl_seconds=60.0,
+        semantic_cache_max_size=8,
+    )
+    monkeypatch.setattr(semantic_cache, "get_settings", lambda: settings)
+    semantic_cache.invalidate()
+    yield settings
+    semantic_cache.invalidate()
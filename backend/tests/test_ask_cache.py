@@ -0,0 +1,44 @@
+"""/api/ask must only cache answers the LLM actually generated."""
+import asyncio
+
+import numpy as np
+import pytest
+
+from app import main
+from app.models import AskRequest
+
+
+@pytest.fixture
+def ask_env(cache_settings, monkeypatch):
+    async def retrieve(question, **kwargs):
+        return [{"id": "s1", "text": "raw snippet", "snippet_confidence": 0.9, "metadata": {}}]
+
+    monkeypatch.setattr(main, "embed", lambda texts: np.ones((len(texts), 4), dtype=np.float32))
+    monkeypatch.setattr(main, "aretrieve_and_score", retrieve)
+    monkeypatch.setattr(main.SETTINGS, "semantic_cache_enabled", True)
+    answers: list = []
+
+    async def generate(question, snippet_texts, **kwargs):
+        answer = answers.pop(0)
+        return answer, [None] * len(snippet_texts)
+
+    monkeypatch.setattr(main, "agenerate_answer", generate)
+    return answers
+
+
+def _ask(question="What is it?"):
+    return asyncio.run(main.ask(AskRequest(question=question), current_user={}))
+
+
+def test_failed_generation_falls_back_without_caching(ask_env):
+    ask_env.extend([None, "generated answer"])  # LLM fails once, then recovers
+
+    assert _ask().answer == "raw snippet"
+    assert _ask().answer == "generated answer"
+
+
+def test_generated_answer_is_cached(ask_env):
+    ask_env.append("generated answer")
+
+    assert _ask().answer == "generated answer"
+    assert _ask().answer == "generated answer"  # served from the cache; no second generation
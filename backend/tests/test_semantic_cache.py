@@ -0,0 +1,69 @@
+import numpy as np
+
+from app import semantic_cache
+
+
+def _vec(*values):
+    return np.asarray(values, dtype=np.float32)
+
+
+def test_hit_above_threshold_and_miss_below(cache_settings):
+    semantic_cache.store(_vec(1, 0, 0), "scope", "answer")
+
+    assert semantic_cache.lookup(_vec(1, 0.1, 0), "scope") == "answer"
+    assert semantic_cache.lookup(_vec(1, 1, 0), "scope") is None  # cosine ~0.71
+    assert semantic_cache.lookup(_vec(1, 1, 0), "scope", threshold=0.7) == "answer"
+
+
+def test_scopes_are_isolated(cache_settings):
+    semantic_cache.store(_vec(1, 0), '[["group-a"]]', "a")
+    semantic_cache.store(_vec(1, 0), '[["group-b"]]', "b")
+
+    assert semantic_cache.lookup(_vec(1, 0), '[["group-a"]]') == "a"
+    assert semantic_cache.lookup(_vec(1, 0), '[["group-b"]]') == "b"
+    assert semantic_cache.lookup(_vec(1, 0), '[["group-c"]]') is None
+
+
+def test_invalidate_bumps_version_and_drops_entries(cache_settings):
+    semantic_cache.store(_vec(1, 0), "scope", "answer")
+    version = semantic_cache.kb_version()
+
+    semantic_cache.invalidate()
+
+    assert semantic_cache.kb_version() == version + 1
+    assert semantic_cache.lookup(_vec(1, 0), "scope") is None
+
+
+def test_store_computed_before_a_write_is_dropped(cache_settings):
+    version = semantic_cache.kb_version()
+    semantic_cache.invalidate()  # knowledge base changed while the answer was computed
+
+    semantic_cache.store(_vec(1, 0), "scope", "stale", version=version)
+
+    assert semantic_cache.lookup(_vec(1, 0), "scope") is None
+
+
+def test_expired_entries_miss(cache_settings):
+    semantic_cache.store(_vec(1, 0), "scope", "answer", ttl_seconds=-1)
+
+    assert semantic_cache.lookup(_vec(1, 0), "scope") is None
+
+
+def test_max_size_evicts_least_recently_used(cache_settings):
+    cache_settings.semantic_cache_max_size = 2
+    semantic_cache.store(_vec(1, 0), "a", "first")
+    semantic_cache.store(_vec(1, 0), "b", "second")
+    assert semantic_cache.lookup(_vec(1, 0), "a") == "first"  # "b" is now least recently used
+
+    semantic_cache.store(_vec(1, 0), "c", "third")
+
+    assert semantic_cache.lookup(_vec(1, 0), "a") == "first"
+    assert semantic_cache.lookup(_vec(1, 0), "b") is None
+    assert semantic_cache.lookup(_vec(1, 0), "c") == "third"
+
+
+def test_disabled_cache_never_hits(cache_settings):
+    cache_settings.semantic_cache_enabled = False
+    semantic_cache.store(_vec(1, 0), "scope", "answer")
+
+    assert semantic_cache.lookup(_vec(1, 0), "scope") is None
@@ -0,0 +1,117 @@
+"""Read caches in store.py are keyed by semantic_cache.kb_version(); writes must bump it."""
+import pytest
+
+from app import semantic_cache, store
+
+
+class FakeCollection:
+    """Just enough of a Chroma collection for the store's read and delete paths."""
+
+    def __init__(self, rows=None):
+        self.rows = dict(rows or {})  # id -> (document, metadata)
+
+    def count(self):
+        return len(self.rows)
+
+    def _matches(self, meta, where):
+        for key, cond in (where or {}).items():
+            if isinstance(cond, dict) and "$in" in cond:
+                if meta.get(key) not in cond["$in"]:
+                    return False
+            elif meta.get(key) != cond:
+                return False
+        return True
+
+    def get(self, ids=None, where=None, include=(), limit=None):
+        hits = [
+            (i, doc, meta) for i, (doc, meta) in self.rows.items()
+            if (ids is None or i in ids) and self._matches(meta, where)
+        ][:limit]
+        return {
+            "ids": [i for i, _, _ in hits],
+            "documents": [doc for _, doc, _ in hits],
+            "metadatas": [meta for _, _, meta in hits],
+        }
+
+    def delete(self, ids):
+        for i in ids:
+            self.rows.pop(i, None)
+
+
+def _chunk(pid, group, language="en"):
+    meta = {
+        "title": pid.title(),
+        "parent_id": pid,
+        "chunk_index": "0",
+        "group": group,
+        "original_language": language,
+        "translation_language": language,
+        "is_translation": "false",
+        **store._metadata_fields({"language": language}),
+    }
+    return f"text of {pid}", meta
+
+
+@pytest.fixture
+def collections(monkeypatch):
+    snippets = FakeCollection({
+        "alpha": _chunk("alpha", "faq"),
+        "beta": _chunk("beta", "legal", "de"),
+    })
+    example_questions = FakeCollection()
+    monkeypatch.setattr(store, "_get_collection", lambda: snippets)
+    monkeypatch.setattr(store, "_get_example_questions_collection", lambda: example_questions)
+    semantic_cache.invalidate()
+    yield snippets
+    semantic_cache.invalidate()
+
+
+def test_delete_snippet_bumps_kb_version_and_refreshes_groups(collections):
+    assert store.list_groups() == ["faq", "legal"]
+    version = semantic_cache.kb_version()
+
+    store.delete_snippet("beta")
+
+    assert semantic_cache.kb_version() > version
+    assert store.list_groups() == ["faq"]
+
+
+def test_list_snippets_reflects_delete(collections):
+    snippets, total = store.list_snippets()
+    assert total == 2
+
+    store.delete_snippet("alpha")
+
+    snippets, total = store.list_snippets()
+    assert total == 1
+    assert [s["id"] for s in snippets] == ["beta"]
+
+
+def test_list_snippets_notices_writes_that_skip_kb_version(collections):
+    assert store.list_snippets()[1] == 2
+
+    # e.g. a script in another process, whose invalidate() we never see
+    collections.rows["gamma"] = _chunk("gamma", "faq")
+
+    assert store.list_snippets()[1] == 3
+
+
+def test_list_snippets_filters_and_pages(collections):
+    snippets, total = store.list_snippets(group_name="legal")
+    assert total == 1 and snippets[0]["text"] == "text of beta"
+
+    snippets, total = store.list_snippets(languages=["en"], limit=1)
+    assert total == 1 and snippets[0]["id"] == "alpha"
+
+    snippets, total = store.list_snippets(offset=1, limit=1)
+    assert total == 2 and [s["id"] for s in snippets] == ["beta"]
+
+
+def test_snippet_metadata_cache_follows_kb_version(collections):
+    assert store.get_snippet_metadata("alpha")["language"] == "en"
+
+    collections.rows["alpha"] = _chunk("alpha", "faq", "fr")
+    assert store.get_snippet_metadata("alpha")["language"] == "en"  # cached until a write
+
+    semantic_cache.invalidate()
+    assert store.get_snippet_metadata("alpha")["language"] == "fr"